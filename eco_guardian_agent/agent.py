@@ -3,17 +3,31 @@ from google.adk.agents import Agent, LlmAgent, ParallelAgent, SequentialAgent
 from google.adk.models import Gemini
 from google.adk.tools import google_search
 from google.adk.tools.agent_tool import AgentTool
-from .prompts import *
-from .tools.air_quality import get_air_quality
-from .tools.disease_outbreak import (
-    search_disease_outbreaks_web, 
-    get_disease_outbreaks, 
-    check_symptoms, 
-    find_nearest_hospitals,
-)
-from .tools.uv_index import get_uv_index
-from .tools.weather import get_weather
-from .tools.pollen import get_pollen
+
+# Loaded as eco_guardian_agent.agent by `adk web`, and as a top-level
+# module by the app and scripts run from this directory
+if __package__:
+    from .prompts import *
+    from .tools.agent_tools import (
+        get_air_quality,
+        get_disease_outbreaks,
+        find_nearest_hospitals,
+        get_uv_index,
+        get_weather,
+        get_pollen,
+    )
+    from .tools.disease_outbreak import search_disease_outbreaks_web, check_symptoms
+else:
+    from prompts import *
+    from tools.agent_tools import (
+        get_air_quality,
+        get_disease_outbreaks,
+        find_nearest_hospitals,
+        get_uv_index,
+        get_weather,
+        get_pollen,
+    )
+    from tools.disease_outbreak import search_disease_outbreaks_web, check_symptoms
 
 
 retry_config=types.HttpRetryOptions(
@@ -81,6 +95,17 @@ events_agent = LlmAgent(
     tools=[google_search],
 )
 
+# No tools: writes the dashboard overview from readings already fetched
+dashboard_summary_agent = LlmAgent(
+    name="dashboard_summary_agent",
+    model=Gemini(
+        model="gemini-2.5-flash-lite",
+        retry_options=retry_config
+    ),
+    description="Writes a short overview of a city's environmental readings for the dashboard.",
+    instruction=DASHBOARD_SUMMARY_INSTRUCTION,
+)
+
 outbreak_monitor = LlmAgent(
     name="outbreak_monitor",
     model=Gemini(
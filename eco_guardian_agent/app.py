@@ -5,11 +5,17 @@ Same UI, cleaned backend (ADK + async + caching fixed)
 
 from pathlib import Path
 import streamlit as st
-import asyncio
+import concurrent.futures
+import logging
+import os
 import time
 from datetime import datetime
 from typing import Dict
 from google.genai import types
+from google.adk.agents.run_config import RunConfig, StreamingMode
+
+from tools.geocache import SEED_COORDS
+from tools.loop import default_loop
 
 # ============================================================================
 # CONFIGURATION
@@ -17,20 +23,27 @@ from google.genai import types
 APP_NAME = "EcoGuardian"
 DB_FILE = "/tmp/ecoguardian_sessions.db"
 DB_URL = f"sqlite+aiosqlite:///{DB_FILE}"
+PRECOMPUTE_IN_APP = os.getenv("ECOGUARDIAN_PRECOMPUTE", "0") == "1"
 
 # ============================================================================
-# GLOBAL EVENT LOOP (no asyncio.run anywhere)
+# AGENT EVENT LOOP (long-lived, in its own thread, shared by all sessions)
 # ============================================================================
-try:
-    GLOBAL_LOOP = asyncio.get_running_loop()
-except RuntimeError:
-    GLOBAL_LOOP = asyncio.new_event_loop()
-    asyncio.set_event_loop(GLOBAL_LOOP)
+# The runner, its session DB and the tools' HTTP clients all live on this
+# loop. Script threads only submit work and wait on a thread-safe future,
+# so many sessions' agent runs (and background prefetches) overlap.
+# Coroutines run off the script thread: read st.session_state before
+# submitting, never inside them.
+AGENT_LOOP = default_loop()
+
+
+def submit_in_loop(coro) -> concurrent.futures.Future:
+    """Schedule a coroutine on the agent loop without waiting for it."""
+    return AGENT_LOOP.submit(coro)
 
 
-def run_in_loop(coro):
-    """Run any coroutine on a single global event loop."""
-    return GLOBAL_LOOP.run_until_complete(coro)
+def run_in_loop(coro, timeout: float = None):
+    """Run a coroutine on the agent loop and wait for its result."""
+    return AGENT_LOOP.run(coro, timeout)
 
 # ============================================================================
 # RUNNER INITIALIZATION
@@ -57,6 +70,26 @@ def initialize_runner():
     return runner, session_service, memory_service
 
 
+def _precompute_stopped(future: concurrent.futures.Future):
+    # run_forever() only returns by raising; nobody awaits it, so report it here
+    if not future.cancelled() and future.exception() is not None:
+        logging.getLogger("ecoguardian").error("precompute worker stopped", exc_info=future.exception())
+
+
+@st.cache_resource
+def start_precompute() -> concurrent.futures.Future:
+    """Run the precompute worker on the agent loop (once per process)."""
+    from precompute import run_forever
+
+    future = submit_in_loop(run_forever())
+    future.add_done_callback(_precompute_stopped)
+    return future
+
+
+if PRECOMPUTE_IN_APP:
+    start_precompute()
+
+
 def get_adk():
     if "adk_runner" not in st.session_state:
         st.session_state.adk_runner, st.session_state.session_service, st.session_state.memory_service = initialize_runner()
@@ -90,16 +123,15 @@ def ensure_session_exists(user_id: str, session_id: str):
     return run_in_loop(_create())
 
 
-async def ask_agent_async(query: str, user_id: str, session_id: str) -> str:
+async def ask_agent_async(runner, query: str, user_id: str, session_id: str, city: str) -> str:
     """Send query to agent through Runner and return final text."""
     query_content = types.Content(role="user", parts=[types.Part(text=query)])
-    runner, session_service, memory_service = get_adk()
 
     async for event in runner.run_async(
         user_id=user_id,
         session_id=session_id,
         new_message=query_content,
-        state_delta={"city": st.session_state.selected_city},
+        state_delta={"city": city},
     ):
         if event.is_final_response() and event.content:
             return event.content.parts[0].text
@@ -107,6 +139,55 @@ async def ask_agent_async(query: str, user_id: str, session_id: str) -> str:
     return ""
 
 
+async def stream_agent_async(runner, query: str, user_id: str, session_id: str, city: str):
+    """Like ask_agent_async, but yields the reply so far (full text, not deltas) as it streams.
+
+    Only the root agent's partial text is shown. A turn that ends in a
+    tool call is taken back (its text is superseded), and the final
+    response replaces whatever was streamed before it.
+    """
+    query_content = types.Content(role="user", parts=[types.Part(text=query)])
+
+    root = runner.agent.name
+    streamed, final = "", ""
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=query_content,
+        state_delta={"city": city},
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+    ):
+        if not (event.content and event.content.parts):
+            continue
+        text = "".join(part.text or "" for part in event.content.parts)
+        if event.partial:
+            if event.author == root and text:
+                streamed += text
+                yield streamed
+        elif event.is_final_response():
+            streamed = ""
+            if text:
+                final = text
+                yield final
+        else:
+            # Intermediate turn (tool call / response): drop what it streamed
+            if streamed:
+                yield final
+            streamed = ""
+
+
+def iter_in_loop(agen):
+    """Drive an async generator from the script thread, one item at a time."""
+    try:
+        while True:
+            try:
+                yield run_in_loop(agen.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        run_in_loop(agen.aclose())
+
+
 def agent_call(query: str) -> str:
     """Synchronous wrapper - reuses user's ADK session."""
     user_id = st.session_state.user_id
@@ -115,7 +196,7 @@ def agent_call(query: str) -> str:
     runner, session_service, memory_service = get_adk()
 
     ensure_session_exists(user_id, session_id)
-    return run_in_loop(ask_agent_async(query, user_id, session_id))
+    return run_in_loop(ask_agent_async(runner, query, user_id, session_id, st.session_state.selected_city))
 
 
 def card(title: str, body: str, icon: str, color: str):
@@ -141,6 +222,22 @@ def card(title: str, body: str, icon: str, color: str):
         unsafe_allow_html=True,
     )
 
+def events_panel(body: str):
+    st.markdown(
+        f"""
+        <div style="
+            padding: 25px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            border-radius: 15px;
+            color: white;
+            line-height: 1.8;">
+            {body}
+        </div>
+    """,
+        unsafe_allow_html=True,
+    )
+
+
 # ============================================================================
 # PAGE CONFIGURATION
 # ============================================================================
@@ -246,21 +343,8 @@ with st.sidebar:
 
     # City Selection
     st.subheader("📍 Location")
-    cities = [
-        "Select a city",
-        "New York",
-        "Boston",
-        "Miami",
-        "San Francisco",
-        "Los Angeles",
-        "Chicago",
-        "Houston",
-        "Seattle",
-        "Dallas",
-        "Austin",
-        "Portland",
-        "Denver",
-    ]
+    # Same list the precompute worker keeps warm
+    cities = ["Select a city", *SEED_COORDS]
 
     city = st.selectbox(
         "Choose a city",
@@ -392,36 +476,61 @@ if city == "Select a city":
     st.stop()
 
 # ============================================================================
-# ENVIRONMENT DATA LOADING (SYNC, CACHED, NO ASYNCIO.RUN)
+# ENVIRONMENT DATA LOADING (DIRECT PIPELINE, STREAMED INTO PLACEHOLDERS)
 # ============================================================================
-@st.cache_data(show_spinner=False, ttl=3600)
-def load_environment_data(city_name: str, user_id: str, session_id: str) -> Dict[str, str]:
-    """Fetch environment data using the user's ADK session (sync via run_in_loop)."""
-    queries = {
-        "air": f"Summarize air quality in {city_name} in 3-4 concise lines.",
-        "weather": f"Summarize current weather in {city_name}. Be concise.",
-        "pollen": f"What is the pollen level in {city_name}? Keep it short.",
-        "uv": f"What is the UV index in {city_name}? Explain briefly.",
-        "events": f"List 3-5 upcoming environmental or sustainability events in {city_name}. Be specific with dates if available.",
-    }
+CARDS = {
+    "air": ("Air Quality", "🌫️", "#6a8caf"),
+    "pollen": ("Pollen Level", "🌻", "#d4a700"),
+    "weather": ("Weather", "🌦️", "#4b8bbe"),
+    "uv": ("UV Index", "☀️", "#d9534f"),
+}
+LOADING = "⏳ Loading..."
+
+
+def cached_environment_data(city_name: str) -> Dict:
+    """Last stored dashboard parts for city_name (shared by all sessions), fresh or not."""
+    from dashboard import read_parts
+
+    return read_parts(city_name)
+
+
+def stale_environment_parts(city_name: str):
+    from dashboard import stale_parts
+
+    return stale_parts(city_name)
 
-    results: Dict[str, str] = {
-        key: run_in_loop(ask_agent_async(q, user_id, session_id))
-        for key, q in queries.items()
-    }
-    return results
 
+def render_part(slots: Dict, key: str, value):
+    """Fill one dashboard placeholder."""
+    if key in CARDS:
+        title, icon, color = CARDS[key]
+        with slots[key].container():
+            card(title, value, icon, color)
+    elif key == "events":
+        with slots[key].container():
+            events_panel(value)
+    elif key == "summary":
+        slots[key].info(value)
+    elif key == "timed_out" and value:
+        slots[key].caption(f"⏱️ Still loading: {', '.join(value)}")
 
-# Ensure main session exists once before loading env data
+
+def stream_environment_data(city_name: str, slots: Dict) -> Dict:
+    """Show stored parts, then replace each stale one as soon as its new value arrives."""
+    from dashboard import stream_dashboard
+
+    env_data = {}
+    for key, value in iter_in_loop(stream_dashboard(city_name)):
+        env_data[key] = value
+        render_part(slots, key, value)
+    return env_data
+
+
+# Ensure main session exists once (chat and health tabs use it)
 ensure_session_exists(st.session_state.user_id, st.session_state.adk_session_id)
 
-with st.spinner(f"🔄 Loading environment data for {city}..."):
-    env_data = load_environment_data(
-        city,
-        st.session_state.user_id,
-        st.session_state.adk_session_id,
-    )
-    st.session_state.env_data = env_data
+env_data = cached_environment_data(city)
+slots: Dict = {}
 
 # ============================================================================
 # TABS
@@ -450,18 +559,30 @@ with tab_env:
 
     st.markdown("---")
 
+    slots["summary"] = st.empty()
+    slots["timed_out"] = st.empty()
+
     col1, col2 = st.columns(2)
     with col1:
-        card("Air Quality", env_data["air"], "🌫️", "#6a8caf")
-        card("Pollen Level", env_data["pollen"], "🌻", "#d4a700")
+        slots["air"] = st.empty()
+        slots["pollen"] = st.empty()
     with col2:
-        card("Weather", env_data["weather"], "🌦️", "#4b8bbe")
-        card("UV Index", env_data["uv"], "☀️", "#d9534f")
+        slots["weather"] = st.empty()
+        slots["uv"] = st.empty()
+
+    for key in CARDS:
+        render_part(slots, key, env_data.get(key, LOADING))
+    if env_data.get("summary"):
+        render_part(slots, "summary", env_data["summary"])
 
     st.markdown("---")
     if st.button("🔄 Refresh Data", use_container_width=False):
-        st.cache_data.clear()
-        st.session_state.env_data = {}
+        from dashboard import invalidate_parts, refresh_city
+
+        # Only this city; its current values stay on screen until replaced,
+        # and the recompute is shared with anyone else viewing it
+        invalidate_parts(city)
+        submit_in_loop(refresh_city(city))
         st.rerun()
 
 # ============================================================================
@@ -471,19 +592,8 @@ with tab_events:
     st.subheader(f"🌱 {city} — Environmental Events")
     st.markdown("---")
 
-    st.markdown(
-        f"""
-        <div style="
-            padding: 25px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            border-radius: 15px;
-            color: white;
-            line-height: 1.8;">
-            {env_data["events"]}
-        </div>
-    """,
-        unsafe_allow_html=True,
-    )
+    slots["events"] = st.empty()
+    render_part(slots, "events", env_data.get("events", LOADING))
 
     st.markdown("---")
 
@@ -586,19 +696,28 @@ with tab_chat:
             st.markdown(user_msg)
 
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    reply = agent_call(user_msg)
-                    st.markdown(reply)
-                    st.session_state.messages.append(
-                        {"role": "assistant", "content": reply}
-                    )
-                except Exception as e:
-                    error_msg = f"❌ Error: {str(e)}"
-                    st.error(error_msg)
-                    st.session_state.messages.append(
-                        {"role": "assistant", "content": error_msg}
-                    )
+            try:
+                ensure_session_exists(st.session_state.user_id, st.session_state.adk_session_id)
+                runner, _, _ = get_adk()
+                placeholder = st.empty()
+                reply = ""
+                for reply in iter_in_loop(stream_agent_async(
+                    runner,
+                    user_msg,
+                    st.session_state.user_id,
+                    st.session_state.adk_session_id,
+                    st.session_state.selected_city,
+                )):
+                    placeholder.markdown(reply)
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": reply}
+                )
+            except Exception as e:
+                error_msg = f"❌ Error: {str(e)}"
+                st.error(error_msg)
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": error_msg}
+                )
 
 # ============================================================================
 # FOOTER - SAME AS ORIGINAL
@@ -612,3 +731,11 @@ with footer_col2:
     st.caption(f"💬 Session: ...{st.session_state.adk_session_id[-8:]}")
 with footer_col3:
     st.caption(f"⏰ {datetime.now().strftime('%I:%M %p')}")
+
+# ============================================================================
+# FILL THE DASHBOARD (last, so the rest of the page is already interactive)
+# ============================================================================
+if stale_environment_parts(city):
+    st.session_state.env_data = stream_environment_data(city, slots)
+else:
+    st.session_state.env_data = env_data
@@ -0,0 +1,114 @@
+"""
+Tool latency / CPU benchmark against recorded HTTP fixtures.
+
+    # once, with network: capture fixtures for the sidebar cities
+    python bench_tools.py --mode record
+
+    # any time after, offline
+    python bench_tools.py --mode replay --repeat 20
+    python bench_tools.py --mode replay --latency recorded
+
+Every call is cold: the in-process result caches, the geocoding LRU and
+all SQLite-backed stores (geocode, reverse ZIP, OpenAQ stations,
+Overpass tiles) are cleared first, so each timing includes the tool's
+requests, parsing and post-processing. Bundled data (sidebar city
+coordinates, the ZIP table, the station dump) and the WHO feed index
+stay loaded; they are part of the code, not a cache. The stores live in
+a temporary database of the bench's own (ECOGUARDIAN_CACHE_DB is
+overridden), so the app's and precompute's warm cache is never touched.
+
+Fixtures are written to tools/data/fixtures (ECOGUARDIAN_FIXTURES);
+commit them after recording so replay works from a fresh checkout.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+TOOLS = ["weather", "uv", "air_quality", "pollen", "outbreaks", "hospitals"]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--cities", nargs="*", help="default: the dashboard's city list")
+    parser.add_argument("--tools", nargs="*", choices=TOOLS, default=TOOLS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", default="0", help='seconds, or "recorded"')
+    args = parser.parse_args()
+
+    # Must be set before the tools (and their HTTP clients) are imported
+    os.environ["ECOGUARDIAN_HTTP_MODE"] = args.mode
+    os.environ["ECOGUARDIAN_REPLAY_LATENCY"] = args.latency
+    # Every call wipes the stores: never point them at a real cache
+    bench_db = os.path.join(tempfile.mkdtemp(), "bench_cache.db")
+    os.environ["ECOGUARDIAN_CACHE_DB"] = bench_db
+
+    from tools import openmeteo
+    from tools.air_quality import get_air_quality_async
+    from tools.cache import caches
+    from tools.disease_outbreak import find_nearest_hospitals_async, get_disease_outbreaks_async
+    from tools.fixtures import FIXTURE_DIR
+    from tools.geocache import SEED_COORDS, geocache
+    from tools.loop import run_sync
+    from tools.pollen import get_pollen_async
+    from tools.store import stores
+    from tools.uv_index import get_uv_index_async
+    from tools.weather import get_weather_async
+
+    funcs = {
+        "weather": get_weather_async,
+        "uv": get_uv_index_async,
+        "air_quality": get_air_quality_async,
+        "pollen": get_pollen_async,
+        "outbreaks": get_disease_outbreaks_async,
+        "hospitals": find_nearest_hospitals_async,
+    }
+    foreign = sorted({store.path for store in stores if store.path != bench_db})
+    if foreign:
+        parser.error(f"refusing to clear a cache the bench didn't create: {', '.join(foreign)}")
+    cities = args.cities or list(SEED_COORDS)
+    if args.mode == "replay" and not any(FIXTURE_DIR.glob("*/*.json")):
+        parser.error(f"no fixtures in {FIXTURE_DIR}; run once with --mode record (needs network)")
+    repeat = 1 if args.mode == "record" else args.repeat
+
+    print(f"mode={args.mode} latency={args.latency} cities={len(cities)} repeat={repeat}\n")
+    print(f"{'tool':<12} {'calls':>5} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'cpu ms':>8}")
+
+    for name in args.tools:
+        wall, cpu, errors = [], [], 0
+        for _ in range(repeat):
+            for city in cities:
+                for cache in caches.values():
+                    cache.invalidate()
+                for store in stores:
+                    store.clear()
+                geocache.clear()
+                openmeteo.clear()
+
+                w0, c0 = time.perf_counter(), time.process_time()
+                try:
+                    result = run_sync(funcs[name](city))
+                    if isinstance(result, dict) and result.get("status") == "error":
+                        errors += 1
+                except Exception as e:
+                    errors += 1
+                    print(f"[ERROR] {name}({city}): {e}")
+                wall.append((time.perf_counter() - w0) * 1000)
+                cpu.append((time.process_time() - c0) * 1000)
+
+        print(
+            f"{name:<12} {len(wall):>5} {errors:>6} "
+            f"{statistics.median(wall):>8.1f} {_percentile(wall, 95):>8.1f} "
+            f"{max(wall):>8.1f} {statistics.mean(cpu):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
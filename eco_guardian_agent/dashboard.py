@@ -0,0 +1,490 @@
+"""
+Direct dashboard pipeline.
+
+The dashboard's intents are fixed, so it does not go through root_agent:
+the four environment cards call their tools directly and are formatted
+from the structured results, and the events panel runs events_agent
+(which needs web search) on its own. An optional single summarization
+call (ECOGUARDIAN_DASHBOARD_SUMMARY=1) adds an overview written from the
+same structured readings. First paint costs at most two LLM calls
+instead of ~4 per card, and all parts run concurrently, so it takes
+about as long as the slowest part rather than the sum.
+
+Finished parts go to a city-level store (SQLite, shared by every
+session and Streamlit process) with a TTL per part, keyed only on the
+city: a visitor opening a city someone else loaded recently gets a
+local read, and only the parts that went stale are recomputed. Agent
+runs use a fixed dashboard user, never the visitor's chat session.
+
+A part past its fresh TTL (or invalidated by Refresh) keeps being
+served until its replacement lands. Each part is recomputed through a
+single-flight group keyed on city and part, so every session streaming
+the same city, and the background refresh, share one run; a run
+outlives the page that started it and stores its result when done.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from agent import dashboard_summary_agent, events_agent
+from tools import openmeteo
+from tools.air_quality import get_air_quality_async
+from tools.cache import invalidate_place, max_age
+from tools.geocache import geocache, normalize_city
+from tools.pollen import get_pollen_async
+from tools.singleflight import SingleFlight
+from tools.store import TTLStore
+from tools.uv_index import get_uv_index_async
+from tools.weather import get_weather_async
+
+APP_NAME = "EcoGuardianDashboard"
+DASHBOARD_USER = "dashboard"
+SUMMARY_ENABLED = os.getenv("ECOGUARDIAN_DASHBOARD_SUMMARY", "0") == "1"
+
+# Seconds for the whole dashboard: tools, events agent and summary together
+DASHBOARD_BUDGET = float(os.getenv("ECOGUARDIAN_DASHBOARD_BUDGET", "25"))
+
+TIMED_OUT = "Still loading — refresh in a moment."
+EVENTS_UNAVAILABLE = "Events are unavailable right now."
+
+logger = logging.getLogger("ecoguardian")
+
+CARD_TOOLS = {
+    "air": get_air_quality_async,
+    "weather": get_weather_async,
+    "pollen": get_pollen_async,
+    "uv": get_uv_index_async,
+}
+
+# (fresh_ttl, keep_ttl) in seconds. Younger than fresh: served as is.
+# Older: still served while it is recomputed, until keep_ttl drops it.
+# Cards follow how fast their data changes (and their tool caches); the
+# summary is tied to its fastest-changing input.
+PART_TTLS: Dict[str, Tuple[float, float]] = {
+    "weather": (10 * 60, 6 * 3600),
+    "uv": (30 * 60, 12 * 3600),
+    "air": (20 * 60, 12 * 3600),
+    "pollen": (6 * 3600, 48 * 3600),
+    "events": (6 * 3600, 48 * 3600),
+    "summary": (10 * 60, 6 * 3600),
+}
+
+# Card tools are asked for results at most this old (never a stale
+# stale-while-revalidate value), so a card's "at" is within this of the
+# fetch time of the data it shows
+CARD_MAX_AGE = 60
+
+# Seconds a failed part is not retried. Its error (or, if there is one,
+# its last good value) is served meanwhile, so an outage costs one
+# attempt per part per minute instead of one per page rerun.
+RETRY_AFTER = 60
+
+
+def events_query(city: str) -> str:
+    return f"List 3-5 upcoming environmental or sustainability events in {city}. Be specific with dates if available."
+
+
+# ============================================================================
+# CARD FORMATTING (structured tool result -> card body HTML)
+# ============================================================================
+# WMO weather interpretation codes used by Open-Meteo
+WMO_CODES = {
+    0: "Clear sky",
+    1: "Mainly clear",
+    2: "Partly cloudy",
+    3: "Overcast",
+    45: "Fog",
+    48: "Freezing fog",
+    51: "Light drizzle",
+    53: "Drizzle",
+    55: "Heavy drizzle",
+    56: "Freezing drizzle",
+    57: "Freezing drizzle",
+    61: "Light rain",
+    63: "Rain",
+    65: "Heavy rain",
+    66: "Freezing rain",
+    67: "Freezing rain",
+    71: "Light snow",
+    73: "Snow",
+    75: "Heavy snow",
+    77: "Snow grains",
+    80: "Rain showers",
+    81: "Rain showers",
+    82: "Violent rain showers",
+    85: "Snow showers",
+    86: "Snow showers",
+    95: "Thunderstorm",
+    96: "Thunderstorm with hail",
+    99: "Thunderstorm with hail",
+}
+
+# Pollutants shown on the air card, in order
+AIR_COMPONENTS = [
+    ("pm25", "PM2.5"),
+    ("pm2_5", "PM2.5"),
+    ("pm10", "PM10"),
+    ("o3", "Ozone"),
+    ("ozone", "Ozone"),
+    ("no2", "NO₂"),
+    ("nitrogen_dioxide", "NO₂"),
+]
+
+
+def _unavailable(what: str, result: Dict) -> str:
+    return f"{what} data is unavailable right now.<br><i>{result.get('message', '')}</i>"
+
+
+def _fmt(value, digits: int = 1) -> str:
+    if value is None:
+        return "–"
+    return f"{value:.{digits}f}" if isinstance(value, float) else str(value)
+
+
+def _stale_note(result: Dict) -> str:
+    return "<br><i>Showing last known values (provider unavailable)</i>" if result.get("served_stale") else ""
+
+
+def format_air(result: Dict) -> str:
+    if result.get("status") != "success":
+        return _unavailable("Air quality", result)
+
+    components = result.get("components", {})
+    shown, seen = [], set()
+    for key, label in AIR_COMPONENTS:
+        reading = components.get(key)
+        if reading and label not in seen and reading.get("value") is not None:
+            seen.add(label)
+            shown.append(f"{label} {_fmt(reading['value'])} {reading.get('units') or ''}".strip())
+
+    if result.get("us_aqi") is not None:
+        headline = f"US AQI <b>{result['us_aqi']}</b> — {result.get('category')}"
+    else:
+        headline = f"<b>{result.get('category') or 'No PM2.5 reading'}</b>"
+
+    lines = [headline]
+    if shown:
+        lines.append(" · ".join(shown))
+    station = result.get("station", {}).get("name")
+    lines.append(f"<i>Source: {result.get('source')}{f' — {station}' if station else ''}</i>")
+    return "<br>".join(lines) + _stale_note(result)
+
+
+def format_weather(result: Dict) -> str:
+    if result.get("status") != "success":
+        return _unavailable("Weather", result)
+
+    sky = WMO_CODES.get(result.get("weather_code"), "")
+    return "<br>".join([
+        f"<b>{_fmt(result.get('temperature_c'))}°C</b>{f' · {sky}' if sky else ''}",
+        f"Humidity {_fmt(result.get('humidity'))}% · Wind {_fmt(result.get('wind_speed'))} km/h"
+        f" · Clouds {_fmt(result.get('cloud_cover_percent'))}%",
+        f"Precipitation {_fmt(result.get('precipitation_mm'))} mm",
+    ]) + _stale_note(result)
+
+
+def format_pollen(result: Dict) -> str:
+    if result.get("status") != "success":
+        return _unavailable("Pollen", result)
+
+    lines = [f"Index <b>{_fmt(result.get('pollen_index'))}</b> / 12 — {result.get('category') or 'Unknown'}"]
+    triggers = []
+    for key in ("tree_pollen", "grass_pollen", "weed_pollen"):
+        trigger = result.get(key)
+        if isinstance(trigger, dict) and trigger.get("Name"):
+            triggers.append(trigger["Name"])
+    if triggers:
+        lines.append("Top allergens: " + ", ".join(triggers))
+    if result.get("period"):
+        lines.append(f"<i>{result['period']} · ZIP {result.get('zipcode')}</i>")
+    return "<br>".join(lines) + _stale_note(result)
+
+
+def format_uv(result: Dict) -> str:
+    if result.get("status") != "success":
+        return _unavailable("UV", result)
+
+    lines = [
+        f"Now <b>{_fmt(result.get('uv_current'))}</b> — {result.get('uv_category') or 'Unknown'}",
+        f"Today's max {_fmt(result.get('uv_today_max'))} ({result.get('uv_today_max_category')})"
+        + (f", peak {result['uv_peak_window']}" if result.get("uv_peak_window") else ""),
+    ]
+    if (result.get("uv_today_max") or 0) >= 3:
+        lines.append("SPF 30+, shade and a hat around the peak hours.")
+    return "<br>".join(lines) + _stale_note(result)
+
+
+FORMATTERS = {
+    "air": format_air,
+    "weather": format_weather,
+    "pollen": format_pollen,
+    "uv": format_uv,
+}
+
+
+# ============================================================================
+# DIRECT AGENT RUNS (ephemeral sessions, no root router)
+# ============================================================================
+_session_service = InMemorySessionService()
+_runners: Dict[str, Runner] = {}
+
+
+def _runner_for(agent) -> Runner:
+    if agent.name not in _runners:
+        _runners[agent.name] = Runner(agent=agent, app_name=APP_NAME, session_service=_session_service)
+    return _runners[agent.name]
+
+
+async def run_agent_once(agent, text: str, user_id: str = DASHBOARD_USER) -> str:
+    """Run one agent on one message in a throwaway session; final text."""
+    runner = _runner_for(agent)
+    session = await _session_service.create_session(
+        app_name=APP_NAME, user_id=user_id, session_id=f"dash_{uuid.uuid4().hex}"
+    )
+    try:
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        async for event in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+            if event.is_final_response() and event.content:
+                return event.content.parts[0].text
+        return ""
+    finally:
+        await _session_service.delete_session(app_name=APP_NAME, user_id=user_id, session_id=session.id)
+
+
+async def summarize(city: str, results: Dict[str, Dict]) -> str:
+    readings = {key: r for key, r in results.items() if isinstance(r, dict)}
+    text = f"City: {city}\nReadings:\n{json.dumps(readings, default=str)}"
+    return await run_agent_once(dashboard_summary_agent, text)
+
+
+# ============================================================================
+# SHARED CITY STORE
+# ============================================================================
+_store = TTLStore("dashboard")
+
+
+def dashboard_parts(summary: Optional[bool] = None) -> List[str]:
+    parts = list(CARD_TOOLS) + ["events"]
+    if SUMMARY_ENABLED if summary is None else summary:
+        parts.append("summary")
+    return parts
+
+
+def _store_key(city: str, part: str) -> str:
+    return f"{normalize_city(city)}:{part}"
+
+
+def _read(city: str, summary: Optional[bool], lead: float = 0.0) -> Dict[str, Tuple[Any, bool]]:
+    """part -> (stored value, is fresh) for every part the store still keeps.
+
+    Entries are {"value", "at"} for a computed part or {"error", "at"}
+    for a failed one; either may carry "retry_after" (fresh until then)
+    or "invalidated". With lead > 0, parts in the last `lead` fraction of
+    their fresh TTL already count as stale (the precompute worker renews
+    them early).
+    """
+    now = time.time()
+    entries = {}
+    for part in dashboard_parts(summary):
+        found, entry = _store.get(_store_key(city, part))
+        if found:
+            fresh = not entry.get("invalidated") and (
+                now - entry["at"] < PART_TTLS[part][0] * (1 - lead) or now < entry.get("retry_after", 0)
+            )
+            entries[part] = (entry["value"] if "value" in entry else entry["error"], fresh)
+    return entries
+
+
+def read_parts(city: str, summary: Optional[bool] = None) -> Dict[str, Any]:
+    """Last stored value of each part for city, fresh or not (any session may have computed them)."""
+    return {part: value for part, (value, _) in _read(city, summary).items() if value is not None}
+
+
+def _stale(entries: Dict[str, Tuple[Any, bool]], summary: Optional[bool]) -> List[str]:
+    return [part for part in dashboard_parts(summary) if not entries.get(part, (None, False))[1]]
+
+
+def stale_parts(city: str, summary: Optional[bool] = None, lead: float = 0.0) -> List[str]:
+    """Parts of city that are missing, past their fresh TTL or invalidated."""
+    return _stale(_read(city, summary, lead), summary)
+
+
+def _storable(part: str, result: Any) -> bool:
+    """Errors, stale fallbacks and placeholders only get a short-lived failure entry."""
+    if part in CARD_TOOLS:
+        return isinstance(result, dict) and result.get("status") == "success" and not result.get("served_stale")
+    if part == "events":
+        return bool(result) and result != EVENTS_UNAVAILABLE
+    return bool(result)
+
+
+def save_part(city: str, part: str, value: Any):
+    _store.set(_store_key(city, part), {"value": value, "at": time.time()}, PART_TTLS[part][1])
+
+
+def save_failure(city: str, part: str, rendered: Any):
+    """Hold off retrying a failed part for RETRY_AFTER seconds.
+
+    A last good value stays and keeps being served; otherwise the
+    rendered error is what readers get until the retry.
+    """
+    key = _store_key(city, part)
+    now = time.time()
+    found, entry = _store.get(key)
+    remaining = entry["at"] + PART_TTLS[part][1] - now if found and "value" in entry else 0
+    if remaining > 0:
+        entry.pop("invalidated", None)
+        _store.set(key, {**entry, "retry_after": now + RETRY_AFTER}, remaining)
+    else:
+        _store.set(key, {"error": rendered, "at": now, "retry_after": now + RETRY_AFTER}, RETRY_AFTER)
+
+
+def invalidate_parts(city: str, parts: Optional[List[str]] = None):
+    """Mark city's parts (default: all) stale. Their values are served until recomputed.
+
+    Card parts also drop their tools' cached results for the city and
+    its Open-Meteo snapshot, so the recompute fetches new data instead
+    of re-rendering what the caches still hold.
+    """
+    now = time.time()
+    parts = parts or list(PART_TTLS)
+    cards = [CARD_TOOLS[part] for part in parts if part in CARD_TOOLS]
+    if cards:
+        invalidate_place(city, cards)
+        _, coords = geocache.lookup(city)
+        if coords:
+            openmeteo.invalidate(*coords)
+    for part in parts:
+        key = _store_key(city, part)
+        found, entry = _store.get(key)
+        if found and "value" not in entry:
+            _store.delete(key)
+            continue
+        remaining = entry["at"] + PART_TTLS[part][1] - now if found else 0
+        if remaining > 0:
+            _store.set(key, {**entry, "invalidated": True}, remaining)
+
+
+# ============================================================================
+# PIPELINE
+# ============================================================================
+async def fetch_card(key: str, city: str) -> Dict:
+    try:
+        with max_age(CARD_MAX_AGE):
+            return await CARD_TOOLS[key](city)
+    except Exception as e:
+        logger.exception("%s card for %s failed", key, city)
+        return {"status": "error", "message": str(e)}
+
+
+async def fetch_events(city: str) -> str:
+    try:
+        return await run_agent_once(events_agent, events_query(city))
+    except Exception:
+        logger.exception("events for %s failed", city)
+        return EVENTS_UNAVAILABLE
+
+
+async def fetch_summary(city: str) -> Optional[str]:
+    # Tool caches (and their single-flight groups) make these card calls cheap
+    results = dict(zip(CARD_TOOLS, await asyncio.gather(*(fetch_card(key, city) for key in CARD_TOOLS))))
+    try:
+        return await summarize(city, results)
+    except Exception:
+        logger.exception("summary for %s failed", city)
+        return None
+
+
+_flights = SingleFlight("dashboard")
+
+
+async def _compute(city: str, part: str) -> Any:
+    if part in CARD_TOOLS:
+        result = await fetch_card(part, city)
+        value = FORMATTERS[part](result)
+    elif part == "events":
+        result = value = await fetch_events(city)
+    else:
+        result = value = await fetch_summary(city)
+    if _storable(part, result):
+        save_part(city, part, value)
+    else:
+        save_failure(city, part, value)
+    return value
+
+
+async def compute_part(city: str, part: str) -> Any:
+    """Rendered value of one part, recomputed and stored once however many sessions ask."""
+    return await _flights.do(_store_key(city, part), lambda: _compute(city, part))
+
+
+async def refresh_city(city: str, summary: Optional[bool] = None, budget: float = DASHBOARD_BUDGET,
+                       lead: float = 0.0) -> List[str]:
+    """Recompute city's stale parts (Refresh, precompute); returns the parts still running at the deadline."""
+    tasks = {part: asyncio.ensure_future(compute_part(city, part)) for part in stale_parts(city, summary, lead)}
+    if not tasks:
+        return []
+    _, pending = await asyncio.wait(tasks.values(), timeout=budget)
+    for task in pending:
+        task.cancel()
+    return [part for part, task in tasks.items() if task in pending]
+
+
+async def stream_dashboard(city: str, summary: Optional[bool] = None,
+                           budget: float = DASHBOARD_BUDGET) -> AsyncIterator[Tuple[str, Any]]:
+    """Yield (part, rendered value): stored parts first, then replacements as each finishes.
+
+    Parts are the card keys ("air", "weather", "pollen", "uv"), "events"
+    and optionally "summary". Parts missing or stale in the shared store
+    are recomputed concurrently (each agent run in its own throwaway
+    session, never the user's chat session) under one total deadline.
+    This stream stops waiting for parts still running then: those without
+    a previous value are yielded as TIMED_OUT, and the stream ends with
+    ("timed_out", [parts]). The runs themselves finish in the background.
+    """
+    entries = _read(city, summary)
+    for key, (value, _) in entries.items():
+        if value is not None:
+            yield key, value
+
+    tasks = {part: asyncio.create_task(compute_part(city, part)) for part in _stale(entries, summary)}
+    names = {task: key for key, task in tasks.items()}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + budget
+    pending = set(tasks.values())
+
+    try:
+        while pending and (remaining := deadline - loop.time()) > 0:
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                key = names[task]
+                value = task.result()
+                if value is not None:
+                    yield key, value
+    finally:
+        # Also runs when the consumer stops early; only this stream's wait is cancelled
+        for task in pending:
+            task.cancel()
+
+    timed_out = sorted(names[task] for task in pending)
+    for key in timed_out:
+        if key != "summary" and key not in entries:
+            yield key, TIMED_OUT
+    yield "timed_out", timed_out
+
+
+async def load_dashboard_async(city: str, summary: Optional[bool] = None,
+                               budget: float = DASHBOARD_BUDGET) -> Dict:
+    """All of stream_dashboard() collected into one dict."""
+    cards: Dict = {}
+    async for key, value in stream_dashboard(city, summary, budget):
+        cards[key] = value
+    return cards
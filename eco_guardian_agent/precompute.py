@@ -0,0 +1,85 @@
+"""
+Precompute worker: keeps the shared dashboard store warm for the sidebar cities.
+
+    # next to the app, until stopped
+    python precompute.py
+
+    # a single pass (cron, deploy hook)
+    python precompute.py --once --summary
+
+    # or inside the Streamlit process, on its agent loop
+    ECOGUARDIAN_PRECOMPUTE=1 streamlit run app.py
+
+Every --interval seconds each city's parts that are missing, invalidated
+or in the last --lead fraction of their fresh TTL are recomputed, so each
+data type is renewed on its own schedule (dashboard.PART_TTLS: weather
+about every 10 minutes, air and UV every 20-30, pollen and events every
+few hours). Results land in the dashboard store app.py reads, so opening
+a city is a local read. Card parts go through the tools, which also
+warms their on-disk caches (geocoding, air-quality stations, map tiles).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from dashboard import DASHBOARD_BUDGET, refresh_city
+from tools.geocache import SEED_COORDS
+
+PRECOMPUTE_INTERVAL = float(os.getenv("ECOGUARDIAN_PRECOMPUTE_INTERVAL", "60"))
+PRECOMPUTE_LEAD = 0.2
+
+logger = logging.getLogger("ecoguardian")
+
+
+async def precompute_once(cities: Iterable[str], summary: Optional[bool] = None,
+                          lead: float = PRECOMPUTE_LEAD, budget: float = DASHBOARD_BUDGET) -> Dict[str, List[str]]:
+    """One pass, a city at a time (its parts concurrently); returns parts still running, by city."""
+    timed_out = {}
+    for city in cities:
+        try:
+            parts = await refresh_city(city, summary, budget, lead)
+        except Exception:
+            logger.exception("precompute for %s failed", city)
+            continue
+        if parts:
+            timed_out[city] = parts
+    return timed_out
+
+
+async def run_forever(cities: Optional[Iterable[str]] = None, summary: Optional[bool] = None,
+                      interval: float = PRECOMPUTE_INTERVAL, lead: float = PRECOMPUTE_LEAD):
+    cities = list(cities or SEED_COORDS)
+    while True:
+        start = time.monotonic()
+        for city, parts in (await precompute_once(cities, summary, lead)).items():
+            logger.warning("precompute for %s timed out: %s", city, ", ".join(parts))
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", nargs="*", help="default: the dashboard's city list")
+    parser.add_argument("--once", action="store_true", help="one pass, then exit")
+    parser.add_argument("--interval", type=float, default=PRECOMPUTE_INTERVAL)
+    parser.add_argument("--lead", type=float, default=PRECOMPUTE_LEAD,
+                        help="renew parts this fraction of their fresh TTL early")
+    parser.add_argument("--summary", action="store_true", default=None,
+                        help="also precompute the summary (default: ECOGUARDIAN_DASHBOARD_SUMMARY)")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    cities = args.cities or list(SEED_COORDS)
+    if args.once:
+        timed_out = asyncio.run(precompute_once(cities, args.summary, args.lead))
+        for city, parts in timed_out.items():
+            logger.warning("precompute for %s timed out: %s", city, ", ".join(parts))
+        print(f"Precomputed {len(cities) - len(timed_out)}/{len(cities)} cities")
+    else:
+        asyncio.run(run_forever(cities, args.summary, args.interval, args.lead))
+
+
+if __name__ == "__main__":
+    main()
@@ -366,4 +366,17 @@ For non-urgent:
 - Mention that appointments may be needed
 
 Always be clear and direct. In emergencies, brevity saves lives.
-"""
\ No newline at end of file
+"""
+DASHBOARD_SUMMARY_INSTRUCTION = """
+  You write the one-paragraph overview at the top of the EcoGuardian dashboard.
+
+  The message contains a city name and JSON with the latest structured readings
+  (air quality, weather, pollen, UV). Use ONLY those numbers; never invent values.
+
+  Your final answer MUST:
+  - Be 2–3 sentences, plain text, no headings or bullet points.
+  - Lead with the single most health-relevant condition right now
+    (e.g. unhealthy air, very high UV, high pollen), then briefly cover the rest.
+  - End with one practical suggestion for the day (e.g. best time to be outdoors).
+  - If a reading is missing or marked as an error, skip it rather than guessing.
+"""
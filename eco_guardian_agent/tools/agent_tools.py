@@ -0,0 +1,64 @@
+"""
+Model-facing tool functions.
+
+The agents see these names, signatures and docstrings, the same as the
+original sync tools. Each is a thin async wrapper over the cached
+*_async implementation, so ADK awaits it on the event loop instead of
+running blocking I/O inline, and options such as include_raw stay out
+of the schema the model sees.
+"""
+from typing import Dict, Optional
+
+from .air_quality import get_air_quality_async
+from .disease_outbreak import find_nearest_hospitals_async, get_disease_outbreaks_async
+from .pollen import get_pollen_async
+from .uv_index import get_uv_index_async
+from .weather import get_weather_async
+
+
+async def get_air_quality(city: str):
+    """Return air quality (PM2.5 + all pollutants) from OpenAQ v3."""
+    return await get_air_quality_async(city)
+
+
+async def get_weather(city: str):
+    """Fetch current weather (numeric only) using Open-Meteo API."""
+    return await get_weather_async(city)
+
+
+async def get_pollen(city: str):
+    """Fetch pollen levels (tree, grass, weed) using Pollen.com unofficial API."""
+    return await get_pollen_async(city)
+
+
+async def get_uv_index(city: str):
+    """Retrieve UV index data (current + forecast) from the Open-Meteo weather forecast API."""
+    return await get_uv_index_async(city)
+
+
+async def get_disease_outbreaks(location: str) -> Dict:
+    """
+    Get disease outbreak information from public health sources.
+    Uses multiple data sources including WHO, GDELT, and outbreak databases.
+    
+    Args:
+        location: City, region, or country name
+        
+    Returns:
+        Dictionary with outbreak information
+    """
+    return await get_disease_outbreaks_async(location)
+
+
+async def find_nearest_hospitals(location: str, specialty: Optional[str] = None) -> Dict:
+    """
+    Find nearest hospitals and clinics using OpenStreetMap Overpass API.
+    
+    Args:
+        location: City or area name
+        specialty: Optional specialty (e.g., "emergency", "infectious disease")
+        
+    Returns:
+        List of nearest hospitals with contact information
+    """
+    return await find_nearest_hospitals_async(location, specialty)
@@ -1,57 +1,79 @@
-import requests
 import os
-from .helpers import get_coords
+from . import http_client
+from .cache import cached, location_key
+from .compact import aqi_category, compact_result, pm25_category
+from .helpers import get_coords_async
+from .loop import run_sync
+from .metrics import debug_sample, timed_tool
+from .openmeteo import get_snapshot
+from .stations import registry
 
 OPENAQ_API_KEY = os.getenv("OPENAQ_API_KEY")
 
-def get_air_quality(city: str):
-    """Return air quality (PM2.5 + all pollutants) from OpenAQ v3."""
-    if not OPENAQ_API_KEY:
-        return {"status": "error", "message": "Missing OPENAQ_API_KEY"}
 
-    headers = {
-        "X-API-Key": OPENAQ_API_KEY,
-        "User-Agent": "EcoGuardian/1.0"
+async def modelled_air_quality(city: str, lat: float, lon: float, reason: str):
+    """Open-Meteo modelled air quality, used when OpenAQ has nothing for us."""
+    resp = (await get_snapshot(lat, lon))["air_quality"]
+    if "current" not in resp:
+        return {"status": "error", "message": reason, "raw": resp}
+
+    current = resp["current"]
+    units = resp.get("current_units", {})
+    components = {
+        name: {"value": current.get(name), "units": units.get(name)}
+        for name in current
+        if name not in ("time", "interval", "us_aqi")
+    }
+
+    return {
+        "status": "success",
+        "source": "Open-Meteo (modelled)",
+        "input_city": city,
+        "coords": {"lat": lat, "lon": lon},
+        "note": reason,
+        "us_aqi": current.get("us_aqi"),
+        "category": aqi_category(current.get("us_aqi")),
+        "datetime_local": current.get("time"),
+        "components": components,
     }
 
+@timed_tool("air_quality")
+@compact_result
+@cached("air_quality", key=location_key("city"))
+async def get_air_quality_async(city: str, include_raw: bool = False):
+    """Return air quality (PM2.5 + all pollutants) from OpenAQ v3.
+
+    Set include_raw=True only if per-sensor metadata and the raw /latest
+    payload are really needed.
+    """
     # STEP 1 — Geocode
-    lat, lon = get_coords(city)
+    lat, lon = await get_coords_async(city)
     if lat is None:
         return {"status": "error", "message": f"Could not geocode: {city}"}
 
-    # STEP 2 — Find nearest monitoring station
-    loc_url = "https://api.openaq.org/v3/locations"
-    loc_params = {
-        "coordinates": f"{lat},{lon}",
-        "radius": 25000,   # 25 km
-        "limit": 1,
-        "isMonitor": True
-    }
+    if not OPENAQ_API_KEY:
+        return await modelled_air_quality(city, lat, lon, "Missing OPENAQ_API_KEY")
 
-    loc_resp = requests.get(loc_url, params=loc_params, headers=headers).json()
-    print("[DEBUG] /locations:", loc_resp)
+    headers = {
+        "X-API-Key": OPENAQ_API_KEY,
+        "User-Agent": "EcoGuardian/1.0"
+    }
 
-    if not loc_resp.get("results"):
-        return {"status": "error", "message": "No monitoring stations nearby!", "raw": loc_resp}
+    # STEP 2 — Find nearest monitoring station (within 25 km, cached)
+    station = await registry.find_station(lat, lon, headers)
+    if station is None:
+        return await modelled_air_quality(city, lat, lon, "No monitoring stations nearby!")
 
-    station = loc_resp["results"][0]
     station_id = station["id"]
-    print("[DEBUG] station_id:", station_id)
 
-    # sensorId → parameter name mapping
-    sensor_map = {
-        s["id"]: {
-            "name": s["parameter"]["name"],
-            "units": s["parameter"]["units"],
-        }
-        for s in station.get("sensors", [])
-    }
+    # sensorId (as str) → parameter name mapping
+    sensor_map = station["sensor_map"]
 
     # STEP 3 — Fetch LATEST readings
     latest_url = f"https://api.openaq.org/v3/locations/{station_id}/latest"
-    latest_resp = requests.get(latest_url, headers=headers).json()
-
-    print("[DEBUG] /latest:", latest_resp)
+    latest_resp = (await http_client.aget(latest_url, headers=headers)).json()
+    debug_sample("openaq.latest", city=city, station_id=station_id,
+                 results=len(latest_resp.get("results") or []))
 
     if not latest_resp.get("results"):
         return {
@@ -66,7 +88,7 @@ def get_air_quality(city: str):
 
     for m in latest_resp["results"]:
         sensor_id = m.get("sensorsId")
-        meta = sensor_map.get(sensor_id)
+        meta = sensor_map.get(str(sensor_id))
 
         if not meta:
             continue
@@ -77,11 +99,14 @@ def get_air_quality(city: str):
         components[param] = {
             "value": m.get("value"),
             "units": units,
-            "datetime_utc": m["datetime"]["utc"],
             "datetime_local": m["datetime"]["local"],
-            "coordinates": m.get("coordinates"),
-            "sensor_id": sensor_id,
         }
+        if include_raw:
+            components[param].update({
+                "datetime_utc": m["datetime"]["utc"],
+                "coordinates": m.get("coordinates"),
+                "sensor_id": sensor_id,
+            })
 
     return {
         "status": "success",
@@ -91,8 +116,14 @@ def get_air_quality(city: str):
         "station": {
             "id": station_id,
             "name": station.get("name"),
-            "country": station.get("country", {}).get("name"),
+            "country": station.get("country"),
         },
         "components": components,  # ALL pollutants with metadata
+        "category": pm25_category(components.get("pm25", {}).get("value")),
         "latest_raw": latest_resp,
     }
+
+
+def get_air_quality(city: str, include_raw: bool = False):
+    """Sync wrapper around get_air_quality_async() for scripts."""
+    return run_sync(get_air_quality_async(city, include_raw))
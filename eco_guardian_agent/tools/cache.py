@@ -0,0 +1,284 @@
+"""
+Stale-while-revalidate result cache for tool functions.
+
+    @cached("weather", key=location_key("city"))
+    async def get_weather_async(city: str, ...): ...
+
+Each tool has a soft TTL and a hard TTL (TOOL_TTLS). Younger than soft:
+served as is. Between soft and hard: served immediately while one
+background task refreshes it. Older than hard: recomputed inline, so a
+result is never served staler than its hard TTL -- unless the provider
+is rate limited or its circuit is open (ProviderUnavailable), in which
+case an entry up to OUTAGE_MAX_AGE_FACTOR hard TTLs old is served,
+marked served_stale, rather than nothing. Concurrent misses for the same
+key are coalesced into one call (singleflight.py). Entries are keyed on
+quantized coordinates, so "NYC" and "New York" share an entry, and each
+cache is a size-bounded LRU.
+
+Callers that store what they get (the dashboard) wrap their calls in
+max_age(seconds): older results, stale ones included, are recomputed
+inline, so the caller's own freshness clock starts near the fetch time
+instead of stacking on top of the tool's.
+"""
+import asyncio
+import contextlib
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .geocache import geocache, normalize_city
+from .providers import ProviderUnavailable
+from .singleflight import SingleFlight
+
+logger = logging.getLogger("ecoguardian")
+
+# (soft_ttl, hard_ttl) in seconds, by how fast each kind of data changes
+TOOL_TTLS: Dict[str, Tuple[float, float]] = {
+    "weather": (5 * 60, 15 * 60),
+    "uv": (30 * 60, 60 * 60),
+    "air_quality": (20 * 60, 60 * 60),
+    "pollen": (6 * 3600, 24 * 3600),
+    "outbreaks": (30 * 60, 3 * 3600),
+    "hospitals": (24 * 3600, 7 * 24 * 3600),
+}
+
+DEFAULT_MAXSIZE = 512
+
+# Expired entries are kept this many hard TTLs, for provider outages only
+OUTAGE_MAX_AGE_FACTOR = 4
+
+# ~2 km: nearby requests share an entry
+COORD_QUANTUM_DEG = 0.02
+
+caches: Dict[str, "ResultCache"] = {}
+
+# Age limit on served results for the current task (see max_age())
+_max_age: ContextVar[Optional[float]] = ContextVar("ecoguardian_max_age", default=None)
+
+
+@contextlib.contextmanager
+def max_age(seconds: float):
+    """Inside the block, tools serve no stale results and nothing older than `seconds`.
+
+    Also honoured by the Open-Meteo snapshot cache, so a recompute really
+    goes upstream. Tasks started inside the block inherit the limit.
+    """
+    token = _max_age.set(seconds)
+    try:
+        yield
+    finally:
+        _max_age.reset(token)
+
+
+def current_max_age() -> Optional[float]:
+    return _max_age.get()
+
+
+class ResultCache:
+    def __init__(self, name: str, soft_ttl: float, ttl: float, maxsize: int = DEFAULT_MAXSIZE):
+        self.name = name
+        self.soft_ttl = soft_ttl
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self.outage_hits = 0
+
+    def get(self, key, max_age: Optional[float] = None) -> Tuple[str, Any]:
+        """("fresh" | "stale" | "expired" | "miss", value).
+
+        "expired" entries are past the hard TTL (with max_age: past the
+        soft TTL or max_age) and must be recomputed; their value is only
+        for when the provider is unavailable.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return "miss", None
+            age = now - entry[0]
+            limit = self.ttl if max_age is None else min(self.soft_ttl, max_age)
+            if age >= limit:
+                self.misses += 1
+                if age >= self.ttl * OUTAGE_MAX_AGE_FACTOR:
+                    del self._data[key]
+                    return "miss", None
+                return "expired", entry[1]
+            self._data.move_to_end(key)
+            if age < self.soft_ttl:
+                self.hits += 1
+                return "fresh", entry[1]
+            self.stale_hits += 1
+            return "stale", entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]):
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            served = self.hits + self.stale_hits
+            total = served + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "evictions": self.evictions,
+                "outage_hits": self.outage_hits,
+                "hit_ratio": round(served / total, 3) if total else 0.0,
+            }
+
+
+def _cacheable(result) -> bool:
+    # Never pin an error, or an answer missing timed-out sources, for the whole TTL
+    if not isinstance(result, dict):
+        return True
+    return result.get("status") != "error" and not result.get("partial")
+
+
+def _quantize(lat: float, lon: float) -> Tuple[int, int]:
+    return round(lat / COORD_QUANTUM_DEG), round(lon / COORD_QUANTUM_DEG)
+
+
+def location_key(arg: str) -> Callable:
+    """Key on quantized coordinates of the named place argument, plus the other args."""
+    async def key(arguments: Dict) -> Tuple:
+        from .helpers import get_coords_async
+
+        place = arguments[arg]
+        try:
+            lat, lon = await get_coords_async(place)
+        except ProviderUnavailable:
+            # Geocoder rate limited / circuit open: fall back to the name so
+            # the call still reaches the cache's outage handling
+            lat, lon = None, None
+        if lat is None:
+            where = ("name", normalize_city(place))
+        else:
+            where = _quantize(lat, lon)
+        rest = tuple(sorted((k, repr(v)) for k, v in arguments.items() if k != arg))
+        return where + rest
+    return key
+
+
+def _default_key(arguments: Dict) -> Tuple:
+    return tuple(sorted((k, repr(v)) for k, v in arguments.items()))
+
+
+def cached(name: str, key: Optional[Callable] = None, maxsize: int = DEFAULT_MAXSIZE):
+    """Stale-while-revalidate cache for an async tool, with TTLs from TOOL_TTLS[name]."""
+    soft_ttl, ttl = TOOL_TTLS[name]
+    cache = caches[name] = ResultCache(name, soft_ttl, ttl, maxsize)
+    flights = SingleFlight(f"tool:{name}")
+    make_key = key or _default_key
+
+    def decorator(func):
+        sig = inspect.signature(func)
+        refreshing = set()
+        background = set()
+
+        async def call(cache_key, args, kwargs):
+            result = await func(*args, **kwargs)
+            if _cacheable(result):
+                cache.put(cache_key, result)
+            return result
+
+        def compute(cache_key, args, kwargs):
+            # Identical concurrent misses share one upstream call
+            return flights.do(cache_key, lambda: call(cache_key, args, kwargs))
+
+        async def refresh(cache_key, args, kwargs):
+            try:
+                await compute(cache_key, args, kwargs)
+                cache.refreshes += 1
+            except Exception as e:
+                logger.error("background refresh of %s failed: %s", name, e, exc_info=True)
+            finally:
+                refreshing.discard(cache_key)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                cache_key = make_key(bound.arguments)
+                if inspect.isawaitable(cache_key):
+                    cache_key = await cache_key
+            except ProviderUnavailable as e:
+                return {"status": "error", "message": str(e)}
+
+            state, value = cache.get(cache_key, _max_age.get())
+            if state == "fresh":
+                return value
+            if state == "stale":
+                if cache_key not in refreshing:
+                    refreshing.add(cache_key)
+                    task = asyncio.create_task(refresh(cache_key, args, kwargs))
+                    background.add(task)
+                    task.add_done_callback(background.discard)
+                return value
+
+            try:
+                return await compute(cache_key, args, kwargs)
+            except ProviderUnavailable as e:
+                # Fail fast: last known value if there is one, else an error result
+                if state == "expired":
+                    cache.outage_hits += 1
+                    if isinstance(value, dict):
+                        return {**value, "served_stale": True, "stale_reason": str(e)}
+                    return value
+                return {"status": "error", "message": str(e)}
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def invalidate_place(place: str, tools: Optional[Iterable[Callable]] = None):
+    """Drop results cached for place by location_key() (every tool, or just these cached tools).
+
+    Entries keyed on the geocoder's coordinates and on the name fallback
+    both go. Coordinates come from the geocoding cache only; a place it
+    doesn't know has no coordinate-keyed entries anyway.
+    """
+    _, coords = geocache.lookup(place)
+    wheres = {("name", normalize_city(place))}
+    if coords:
+        wheres.add(_quantize(*coords))
+    targets = caches.values() if tools is None else [tool.cache for tool in tools if hasattr(tool, "cache")]
+    for cache in targets:
+        cache.invalidate_where(lambda key: isinstance(key, tuple) and key[:2] in wheres)
+
+
+def cache_stats() -> Dict[str, Dict]:
+    return {name: c.stats() for name, c in caches.items()}
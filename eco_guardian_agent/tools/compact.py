@@ -0,0 +1,160 @@
+"""
+Compact tool output.
+
+Everything a tool returns is serialized into the sub-agent's context, so
+by default tools return precomputed summaries and drop raw provider
+payloads (callers can still ask for them with include_raw=True). Each
+result also carries a rough token estimate of its own size.
+"""
+import functools
+import inspect
+import json
+import math
+from typing import Dict, List, Optional
+
+RAW_KEYS = ("raw", "latest_raw")
+
+# ~4 characters per token is the usual rule of thumb for English/JSON
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(obj) -> int:
+    """Rough token count of obj once serialized to JSON."""
+    text = json.dumps(obj, default=str, separators=(",", ":"), ensure_ascii=False)
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def finalize(result: Dict, include_raw: bool = False) -> Dict:
+    """Drop raw payloads (unless asked for) and attach result_tokens_est."""
+    # Always a new dict: the input may be a cached result
+    result = {k: v for k, v in result.items() if include_raw or k not in RAW_KEYS}
+    result["result_tokens_est"] = estimate_tokens(result)
+    return result
+
+
+# -------------------------------------------------
+# CATEGORIES
+# -------------------------------------------------
+def uv_category(uv: Optional[float]) -> Optional[str]:
+    """WHO UV index exposure category."""
+    if uv is None:
+        return None
+    if uv < 3:
+        return "Low"
+    if uv < 6:
+        return "Moderate"
+    if uv < 8:
+        return "High"
+    if uv < 11:
+        return "Very High"
+    return "Extreme"
+
+
+_AQI_CATEGORIES = [
+    (50, "Good"),
+    (100, "Moderate"),
+    (150, "Unhealthy for Sensitive Groups"),
+    (200, "Unhealthy"),
+    (300, "Very Unhealthy"),
+]
+
+# US EPA PM2.5 breakpoints (24h, µg/m³, 2024 revision)
+_PM25_CATEGORIES = [
+    (9.0, "Good"),
+    (35.4, "Moderate"),
+    (55.4, "Unhealthy for Sensitive Groups"),
+    (125.4, "Unhealthy"),
+    (225.4, "Very Unhealthy"),
+]
+
+
+def aqi_category(us_aqi: Optional[float]) -> Optional[str]:
+    if us_aqi is None:
+        return None
+    for upper, name in _AQI_CATEGORIES:
+        if us_aqi <= upper:
+            return name
+    return "Hazardous"
+
+
+def pm25_category(pm25: Optional[float]) -> Optional[str]:
+    if pm25 is None:
+        return None
+    for upper, name in _PM25_CATEGORIES:
+        if pm25 <= upper:
+            return name
+    return "Hazardous"
+
+
+# Pollen.com 0-12 index bands
+_POLLEN_CATEGORIES = [
+    (2.4, "Low"),
+    (4.8, "Low-Medium"),
+    (7.2, "Medium"),
+    (9.6, "Medium-High"),
+]
+
+
+def pollen_category(index: Optional[float]) -> Optional[str]:
+    if index is None:
+        return None
+    for upper, name in _POLLEN_CATEGORIES:
+        if index <= upper:
+            return name
+    return "High"
+
+
+# -------------------------------------------------
+# HOURLY SERIES
+# -------------------------------------------------
+def summarize_hourly(times: List[str], values: List[Optional[float]], now: Optional[str] = None) -> Dict:
+    """Current value, today's max and the peak window of an hourly series.
+
+    times are Open-Meteo ISO strings ("2025-06-01T13:00") in the same
+    timezone as now. The peak window is the span of today's hours within
+    80% of the daily max.
+    """
+    pairs = [(t, v) for t, v in zip(times, values) if v is not None]
+    if not pairs:
+        return {"current": None, "today_max": None, "peak_window": None}
+
+    now = now or pairs[0][0]
+    hour = now[:13]   # "YYYY-MM-DDTHH"
+    today = now[:10]
+
+    current = next((v for t, v in pairs if t[:13] == hour), None)
+    today_pairs = [(t, v) for t, v in pairs if t[:10] == today] or pairs
+    today_max = max(v for _, v in today_pairs)
+
+    peak_window = None
+    if today_max > 0:
+        peak_hours = [t for t, v in today_pairs if v >= 0.8 * today_max]
+        peak_window = f"{peak_hours[0][11:16]}-{peak_hours[-1][11:16]}"
+
+    return {"current": current, "today_max": today_max, "peak_window": peak_window}
+
+
+def compact_result(func):
+    """Decorator: run a tool's result through finalize().
+
+    Honours the tool's own include_raw argument when it has one.
+    """
+    sig = inspect.signature(func)
+
+    def _include_raw(args, kwargs) -> bool:
+        if "include_raw" not in sig.parameters:
+            return False
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return bool(bound.arguments["include_raw"])
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            return finalize(await func(*args, **kwargs), _include_raw(args, kwargs))
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return finalize(func(*args, **kwargs), _include_raw(args, kwargs))
+    return wrapper
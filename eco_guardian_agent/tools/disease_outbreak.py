@@ -1,12 +1,64 @@
-import requests
+import asyncio
+import heapq
+import time
 from datetime import datetime, timezone, timedelta
+from operator import itemgetter
 from typing import List, Dict, Optional
-from .helpers import get_coords
+from . import http_client
+from .cache import cached, location_key
+from .compact import compact_result
+from .geo import haversine_km, haversine_many
+from .overpass_tiles import facilities_near
+from .helpers import get_coords_async
+from .loop import run_sync
+from .metrics import timed_tool
+from .symptoms import matcher
+from .who_feed import who_feed
+
+# Overall latency budget for get_disease_outbreaks, and per-source deadlines
+OUTBREAK_BUDGET = 10
+SOURCE_DEADLINES = {
+    "who": 8,              # index probe; only slow on a cold start
+    "gdelt": 8,
+    "outbreak_info": 6,
+}
+
+# How long a cold process waits for the first WHO feed poll
+WHO_COLD_START_WAIT = SOURCE_DEADLINES["who"]
+
+NEAREST_HOSPITALS = 5
+
+GDELT_URL = "https://api.gdeltproject.org/api/v2/doc/doc"
+GDELT_KEYWORDS = ["outbreak", "epidemic", "disease"]   # 3 keywords to stay under rate limits
+
+
+async def _run_source(name: str, coro) -> Dict:
+    """Await one source under its own deadline and record how it went."""
+    started = time.perf_counter()
+    try:
+        value = await asyncio.wait_for(coro, SOURCE_DEADLINES[name])
+        status = {"status": "ok"}
+    except asyncio.TimeoutError:
+        value = None
+        status = {"status": "timeout"}
+    except Exception as e:
+        value = None
+        status = {"status": "error", "message": str(e)}
 
-def get_disease_outbreaks(location: str) -> Dict:
+    status["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    status["value"] = value
+    return status
+
+
+@timed_tool("outbreaks")
+@compact_result
+@cached("outbreaks", key=location_key("location"))
+async def get_disease_outbreaks_async(location: str) -> Dict:
     """
     Get disease outbreak information from public health sources.
     Uses multiple data sources including WHO, GDELT, and outbreak databases.
+    Sources are queried concurrently; a source that misses its deadline is
+    reported in source_status and the rest are still returned.
     
     Args:
         location: City, region, or country name
@@ -14,202 +66,159 @@ def get_disease_outbreaks(location: str) -> Dict:
     Returns:
         Dictionary with outbreak information
     """
-    lat, lon = get_coords(location)
+    lat, lon = await get_coords_async(location)
     if lat is None:
         return {
             "status": "error",
             "message": f"Could not find coordinates for: {location}"
         }
 
-    try:
-        outbreaks = []
-
-        if who_outbreaks := fetch_who_outbreaks(location):
-            outbreaks.extend(who_outbreaks)
-
-        if gdelt_outbreaks := fetch_gdelt_disease_events(location, lat, lon):
-            outbreaks.extend(gdelt_outbreaks)
+    tasks = {
+        "who": asyncio.create_task(_run_source("who", fetch_who_outbreaks_async(location))),
+        "gdelt": asyncio.create_task(_run_source("gdelt", fetch_gdelt_disease_events_async(location, lat, lon))),
+        "outbreak_info": asyncio.create_task(_run_source("outbreak_info", fetch_outbreak_info_async(location))),
+    }
+    await asyncio.wait(tasks.values(), timeout=OUTBREAK_BUDGET)
+
+    source_status = {}
+    for name, task in tasks.items():
+        if task.done():
+            source_status[name] = task.result()
+        else:
+            task.cancel()
+            source_status[name] = {"status": "timeout", "elapsed_ms": OUTBREAK_BUDGET * 1000, "value": None}
+
+    outbreaks = []
+    outbreaks.extend(source_status["who"].pop("value") or [])
+    outbreaks.extend(source_status["gdelt"].pop("value") or [])
+    if covid_data := source_status["outbreak_info"].pop("value"):
+        outbreaks.append(covid_data)
 
-        if covid_data := fetch_outbreak_info(location):
-            outbreaks.append(covid_data)
+    return {
+        "status": "success",
+        "location": location,
+        "coords": {"lat": lat, "lon": lon},
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "outbreaks": outbreaks,
+        "outbreak_count": len(outbreaks),
+        "sources": [
+            "WHO Disease Outbreak News",
+            "GDELT Disease Events",
+            "outbreak.info",
+        ],
+        "source_status": source_status,
+        "partial": any(st["status"] != "ok" for st in source_status.values()),
+        "note": "Data aggregated from multiple public health surveillance sources.",
+    }
 
-        return {
-            "status": "success",
-            "location": location,
-            "coords": {"lat": lat, "lon": lon},
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "outbreaks": outbreaks,
-            "outbreak_count": len(outbreaks),
-            "sources": [
-                "WHO Disease Outbreak News",
-                "GDELT Disease Events",
-                "outbreak.info",
-            ],
-            "note": "Data aggregated from multiple public health surveillance sources.",
-        }
 
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": f"Error fetching outbreak data: {str(e)}"
-        }
+def get_disease_outbreaks(location: str) -> Dict:
+    """Sync wrapper around get_disease_outbreaks_async() for scripts."""
+    return run_sync(get_disease_outbreaks_async(location))
 
 
-def fetch_who_outbreaks(location: str) -> List[Dict]:
-    # sourcery skip: low-code-quality
+async def fetch_who_outbreaks_async(location: str) -> List[Dict]:
     """
-    Fetch disease outbreaks from WHO Disease Outbreak News RSS feed.
+    Disease outbreaks from the WHO Disease Outbreak News feed.
+
+    The feed is polled and indexed in the background (see who_feed.py);
+    this only waits for the very first poll on a cold start.
     """
-    try:
-        # WHO Disease Outbreak News RSS
-        who_rss = "https://www.who.int/feeds/entity/csr/don/en/rss.xml"
-        
-        response = requests.get(who_rss, timeout=15)
-        if response.status_code != 200:
-            return []
-        
-        # Parse RSS feed (simple XML parsing)
-        import xml.etree.ElementTree as ET
-        root = ET.fromstring(response.content)
-        
-        outbreaks = []
-        location_lower = location.lower()
-        
-        # Parse RSS items
-        for item in root.findall('.//item')[:20]:  # Last 20 items
-            title = item.find('title')
-            link = item.find('link')
-            pub_date = item.find('pubDate')
-            description = item.find('description')
-            
-            if title is not None and title.text:
-                title_text = title.text.lower()
-                
-                # Check if location is mentioned in title or description
-                desc_text = description.text.lower() if description is not None and description.text else ""
-                
-                if location_lower in title_text or location_lower in desc_text:
-                    # Extract disease name from title
-                    disease_name = title.text.split('-')[0].strip() if '-' in title.text else title.text
-                    
-                    outbreaks.append({
-                        "source": "WHO",
-                        "disease": disease_name,
-                        "title": title.text if title is not None else "Unknown",
-                        "url": link.text if link is not None else "",
-                        "published_date": pub_date.text if pub_date is not None else "",
-                        "description": description.text[:200] if description is not None and description.text else "",
-                        "severity": "official_who_report"
-                    })
-        
-        return outbreaks
-        
-    except Exception as e:
-        print(f"[ERROR] WHO RSS fetch failed: {e}")
+    who_feed.ensure_started()
+    if not who_feed.ready:
+        await asyncio.to_thread(who_feed.wait_ready, WHO_COLD_START_WAIT)
+    return who_feed.search(location)
+
+
+async def _fetch_gdelt_keyword(keyword: str, location: str, start_str: str, end_str: str) -> List[Dict]:
+    params = {
+        "query": f"{keyword} {location}",
+        "mode": "artlist",
+        "maxrecords": 5,
+        "format": "json",
+        "startdatetime": f"{start_str}000000",
+        "enddatetime": f"{end_str}235959",
+    }
+
+    response = await http_client.aget(GDELT_URL, params=params, timeout=(3.05, SOURCE_DEADLINES["gdelt"]))
+    if response.status_code != 200:
         return []
 
+    articles = response.json().get("articles", [])
+    return [
+        {
+            "source": "GDELT News Monitor",
+            "disease": keyword.title(),
+            "title": article.get("title", ""),
+            "url": article.get("url", ""),
+            "published_date": article.get("seendate", ""),
+            "domain": article.get("domain", ""),
+            "language": article.get("language", ""),
+            "severity": "news_mention",
+        }
+        for article in articles[:3]
+    ]
+
 
-def fetch_gdelt_disease_events(location: str, lat: float, lon: float) -> List[Dict]:
+async def fetch_gdelt_disease_events_async(location: str, lat: float, lon: float) -> List[Dict]:
     """
     Fetch disease outbreak events from GDELT (Global Database of Events).
     GDELT monitors news worldwide for disease outbreak mentions.
+    Keyword queries run concurrently; raises only if every one failed.
     """
-    try:
-        # GDELT GEO API - search for disease-related events
-        # Free API, no key required
+    # GDELT DOC API - free, no key required. Last 30 days (YYYYMMDD).
+    end_date = datetime.now(timezone.utc)
+    start_date = end_date - timedelta(days=30)
+    start_str = start_date.strftime("%Y%m%d")
+    end_str = end_date.strftime("%Y%m%d")
 
-        # Calculate date range (last 30 days)
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=30)
+    results = await asyncio.gather(
+        *(_fetch_gdelt_keyword(k, location, start_str, end_str) for k in GDELT_KEYWORDS),
+        return_exceptions=True,
+    )
 
-        # Format dates for GDELT (YYYYMMDD)
-        start_str = start_date.strftime("%Y%m%d")
-        end_str = end_date.strftime("%Y%m%d")
+    errors = [r for r in results if isinstance(r, Exception)]
+    if errors and len(errors) == len(results):
+        raise errors[0]
 
-        # Disease keywords to search
-        disease_keywords = [
-            "outbreak", "epidemic", "disease", "infection", 
-            "dengue", "malaria", "cholera", "typhoid", "covid"
-        ]
+    return [o for r in results if not isinstance(r, Exception) for o in r]
 
-        outbreaks = []
-
-        gdelt_url = "https://api.gdeltproject.org/api/v2/doc/doc"
-        # GDELT DOC API endpoint
-        for keyword in disease_keywords[:3]:  # Limit to 3 keywords to avoid rate limits
-            params = {
-                "query": f"{keyword} {location}",
-                "mode": "artlist",
-                "maxrecords": 5,
-                "format": "json",
-                "startdatetime": f"{start_str}000000",
-                "enddatetime": f"{end_str}235959",
-            }
 
-            response = requests.get(gdelt_url, params=params, timeout=15)
-
-            if response.status_code == 200:
-                data = response.json()
-                articles = data.get("articles", [])
-
-                outbreaks.extend(
-                    {
-                        "source": "GDELT News Monitor",
-                        "disease": keyword.title(),
-                        "title": article.get("title", ""),
-                        "url": article.get("url", ""),
-                        "published_date": article.get("seendate", ""),
-                        "domain": article.get("domain", ""),
-                        "language": article.get("language", ""),
-                        "severity": "news_mention",
-                    }
-                    for article in articles[:3]
-                )
-        return outbreaks
-
-    except Exception as e:
-        print(f"[ERROR] GDELT fetch failed: {e}")
-        return []
-
-
-def fetch_outbreak_info(location: str) -> Optional[Dict]:
+async def fetch_outbreak_info_async(location: str) -> Optional[Dict]:
     """
     Fetch COVID-19 data from outbreak.info API.
     """
-    try:
-        # outbreak.info provides COVID-19 genomic surveillance data
-        api_url = "https://api.outbreak.info/genomics/location-lookup"
-        
-        params = {
-            "name": location,
-            "cumulative": True
-        }
-        
-        response = requests.get(api_url, params=params, timeout=15)
+    # outbreak.info provides COVID-19 genomic surveillance data
+    api_url = "https://api.outbreak.info/genomics/location-lookup"
+    
+    params = {
+        "name": location,
+        "cumulative": True
+    }
+    
+    response = await http_client.aget(api_url, params=params, timeout=(3.05, SOURCE_DEADLINES["outbreak_info"]))
+    
+    if response.status_code == 200:
+        data = response.json()
         
-        if response.status_code == 200:
-            data = response.json()
+        if data.get("results"):
+            result = data["results"][0]
             
-            if data.get("results"):
-                result = data["results"][0]
-                
-                return {
-                    "source": "outbreak.info",
-                    "disease": "COVID-19",
-                    "location": result.get("name", location),
-                    "total_sequences": result.get("total_count", 0),
-                    "last_updated": result.get("date_modified", ""),
-                    "severity": "ongoing_surveillance",
-                    "url": "https://outbreak.info"
-                }
-        
-        return None
-        
-    except Exception as e:
-        print(f"[ERROR] outbreak.info fetch failed: {e}")
-        return None
+            return {
+                "source": "outbreak.info",
+                "disease": "COVID-19",
+                "location": result.get("name", location),
+                "total_sequences": result.get("total_count", 0),
+                "last_updated": result.get("date_modified", ""),
+                "severity": "ongoing_surveillance",
+                "url": "https://outbreak.info"
+            }
+    
+    return None
 
 
+@timed_tool("search_outbreaks_web")
+@compact_result
 def search_disease_outbreaks_web(location: str, disease: Optional[str] = None) -> Dict:
     """
     Search for disease outbreak information using web sources.
@@ -222,8 +231,6 @@ def search_disease_outbreaks_web(location: str, disease: Optional[str] = None) -
     Returns:
         Dictionary with outbreak information from web sources
     """
-    lat, lon = get_coords(location)
-    
     search_query = f"disease outbreak {location}"
     if disease:
         search_query = f"{disease} outbreak {location}"
@@ -247,6 +254,8 @@ def search_disease_outbreaks_web(location: str, disease: Optional[str] = None) -
 # -------------------------------------------------
 # SYMPTOM CHECKER
 # -------------------------------------------------
+@timed_tool("check_symptoms")
+@compact_result
 def check_symptoms(symptoms: List[str], location: str) -> Dict:
     """
     Analyze symptoms and match with known disease patterns in the area.
@@ -258,76 +267,8 @@ def check_symptoms(symptoms: List[str], location: str) -> Dict:
     Returns:
         Possible disease matches with severity
     """
-    # Common disease symptom patterns
-    disease_patterns = {
-        "COVID-19": {
-            "symptoms": ["fever", "cough", "fatigue", "loss of taste", "loss of smell", "shortness of breath"],
-            "severity": "moderate to severe",
-            "action": "Get tested immediately, isolate, seek medical care if breathing difficulty"
-        },
-        "Influenza": {
-            "symptoms": ["fever", "cough", "sore throat", "body aches", "fatigue", "headache"],
-            "severity": "moderate",
-            "action": "Rest, hydrate, antiviral medication within 48 hours"
-        },
-        "Dengue Fever": {
-            "symptoms": ["high fever", "severe headache", "pain behind eyes", "joint pain", "muscle pain", "rash", "bleeding"],
-            "severity": "severe",
-            "action": "Seek immediate medical attention, monitor for warning signs"
-        },
-        "Malaria": {
-            "symptoms": ["fever", "chills", "sweating", "headache", "nausea", "vomiting", "body aches"],
-            "severity": "severe",
-            "action": "Urgent medical evaluation and blood test required"
-        },
-        "Typhoid": {
-            "symptoms": ["sustained fever", "headache", "abdominal pain", "constipation", "weakness"],
-            "severity": "severe",
-            "action": "Medical evaluation and blood culture needed"
-        },
-        "Cholera": {
-            "symptoms": ["severe diarrhea", "vomiting", "dehydration", "muscle cramps"],
-            "severity": "severe",
-            "action": "Emergency medical care - severe dehydration risk"
-        },
-        "Measles": {
-            "symptoms": ["fever", "cough", "runny nose", "red eyes", "rash", "white spots in mouth"],
-            "severity": "moderate to severe",
-            "action": "Isolate and seek medical care, highly contagious"
-        },
-        "Common Cold": {
-            "symptoms": ["runny nose", "sneezing", "sore throat", "cough", "mild fever"],
-            "severity": "mild",
-            "action": "Rest, hydrate, over-the-counter medications"
-        }
-    }
-
-    # Normalize symptoms
-    symptoms_lower = [s.lower().strip() for s in symptoms]
-
-    # Match symptoms with diseases
-    matches = []
-    for disease, info in disease_patterns.items():
-        disease_symptoms = [s.lower() for s in info["symptoms"]]
-
-        if matching_symptoms := [
-            s
-            for s in symptoms_lower
-            if any(ds in s or s in ds for ds in disease_symptoms)
-        ]:
-            match_score = len(matching_symptoms) / len(info["symptoms"])
-
-            matches.append({
-                "disease": disease,
-                "match_score": round(match_score * 100, 1),
-                "matching_symptoms": matching_symptoms,
-                "all_symptoms": info["symptoms"],
-                "severity": info["severity"],
-                "recommended_action": info["action"]
-            })
-
-    # Sort by match score
-    matches.sort(key=lambda x: x["match_score"], reverse=True)
+    # Catalog, synonyms and indexes are compiled once at import (symptoms.py)
+    matches = matcher.match(symptoms)
 
     return {
         "status": "success",
@@ -342,7 +283,10 @@ def check_symptoms(symptoms: List[str], location: str) -> Dict:
 # -------------------------------------------------
 # HOSPITAL FINDER
 # -------------------------------------------------
-def find_nearest_hospitals(location: str, specialty: Optional[str] = None) -> Dict:
+@timed_tool("hospitals")
+@compact_result
+@cached("hospitals", key=location_key("location"))
+async def find_nearest_hospitals_async(location: str, specialty: Optional[str] = None) -> Dict:
     # sourcery skip: extract-method
     """
     Find nearest hospitals and clinics using OpenStreetMap Overpass API.
@@ -354,7 +298,7 @@ def find_nearest_hospitals(location: str, specialty: Optional[str] = None) -> Di
     Returns:
         List of nearest hospitals with contact information
     """
-    lat, lon = get_coords(location)
+    lat, lon = await get_coords_async(location)
     if lat is None:
         return {
             "status": "error",
@@ -362,43 +306,21 @@ def find_nearest_hospitals(location: str, specialty: Optional[str] = None) -> Di
         }
     
     try:
-        # Use Overpass API to find hospitals
-        overpass_url = "https://overpass-api.de/api/interpreter"
-        
         # Search radius: 10km
         radius = 10000
         
-        # Overpass QL query for hospitals and clinics
-        query = f"""
-        [out:json][timeout:25];
-        (
-          node["amenity"="hospital"](around:{radius},{lat},{lon});
-          way["amenity"="hospital"](around:{radius},{lat},{lon});
-          node["amenity"="clinic"](around:{radius},{lat},{lon});
-          way["amenity"="clinic"](around:{radius},{lat},{lon});
-          node["amenity"="doctors"](around:{radius},{lat},{lon});
-        );
-        out center;
-        """
-        
-        response = requests.post(overpass_url, data={"data": query}, timeout=30)
-        data = response.json()
-        
+        # Hospitals and clinics from the geohash tile cache (Overpass on a miss)
+        records = await facilities_near(lat, lon, radius)
+
+        # Distances to all facilities in one pass, then heap top-k
+        distances = haversine_many(lat, lon, [r["lat"] for r in records], [r["lon"] for r in records])
+        facilities = [(d, r) for d, r in zip(distances, records) if d <= radius / 1000]
+
         hospitals = []
-        for element in data.get("elements", [])[:10]:  # Limit to 10 results
-            tags = element.get("tags", {})
-            
-            # Get coordinates
-            if element["type"] == "node":
-                h_lat = element.get("lat")
-                h_lon = element.get("lon")
-            else:  # way
-                h_lat = element.get("center", {}).get("lat")
-                h_lon = element.get("center", {}).get("lon")
-            
-            # Calculate distance
-            distance = calculate_distance(lat, lon, h_lat, h_lon)
-            
+        for distance, record in heapq.nsmallest(NEAREST_HOSPITALS, facilities, key=itemgetter(0)):
+            tags = record["tags"]
+            h_lat, h_lon = record["lat"], record["lon"]
+
             hospital_info = {
                 "name": tags.get("name", "Unnamed Healthcare Facility"),
                 "type": tags.get("amenity", "hospital"),
@@ -412,15 +334,12 @@ def find_nearest_hospitals(location: str, specialty: Optional[str] = None) -> Di
             
             hospitals.append(hospital_info)
         
-        # Sort by distance
-        hospitals.sort(key=lambda x: x["distance_km"])
-        
         return {
             "status": "success",
             "location": location,
             "search_coords": {"lat": lat, "lon": lon},
-            "hospitals_found": len(hospitals),
-            "nearest_hospitals": hospitals[:5],  # Top 5 nearest
+            "hospitals_found": len(facilities),
+            "nearest_hospitals": hospitals,  # Top 5 nearest, closest first
             "search_radius_km": radius / 1000,
             "emergency_number": get_emergency_number(location)
         }
@@ -432,20 +351,14 @@ def find_nearest_hospitals(location: str, specialty: Optional[str] = None) -> Di
         }
 
 
+def find_nearest_hospitals(location: str, specialty: Optional[str] = None) -> Dict:
+    """Sync wrapper around find_nearest_hospitals_async() for scripts."""
+    return run_sync(find_nearest_hospitals_async(location, specialty))
+
+
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """Calculate distance between two coordinates using Haversine formula."""
-    from math import radians, sin, cos, sqrt, atan2
-    
-    R = 6371  # Earth's radius in km
-    
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
-    
-    return R * c
+    return haversine_km(lat1, lon1, lat2, lon2)
 
 
 def get_emergency_number(location: str) -> str:  # sourcery skip: use-next
@@ -0,0 +1,204 @@
+"""
+Record/replay of provider HTTP traffic.
+
+ECOGUARDIAN_HTTP_MODE selects what http_client talks to:
+
+  live    (default) the real providers
+  record  the real providers, saving every response as a fixture file
+  replay  fixture files only; no network (a missing fixture is an error)
+
+Fixtures live in ECOGUARDIAN_FIXTURES (default tools/data/fixtures), one
+JSON file per request under a directory per host, named by a hash of
+method + URL (query params sorted, time-window params dropped) + body,
+so a fixture recorded one day still replays the next. Request headers are never
+stored, so API keys stay out of the fixtures. Files carry
+FIXTURE_VERSION; a replay refuses files of another version.
+
+ECOGUARDIAN_REPLAY_LATENCY adds latency to replayed responses: seconds
+as a number, or "recorded" to sleep for the originally measured time.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+FIXTURE_VERSION = 1
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+MODE = os.getenv("ECOGUARDIAN_HTTP_MODE", LIVE).lower()
+FIXTURE_DIR = Path(os.getenv(
+    "ECOGUARDIAN_FIXTURES",
+    str(Path(__file__).parent / "data" / "fixtures"),
+))
+REPLAY_LATENCY = os.getenv("ECOGUARDIAN_REPLAY_LATENCY", "0")
+
+# Response headers worth keeping (conditional GETs, content type)
+KEEP_HEADERS = ("content-type", "etag", "last-modified")
+
+# Query params derived from the clock (GDELT's 30-day window), left out
+# of the fixture key
+VOLATILE_PARAMS = {
+    "api.gdeltproject.org": ("startdatetime", "enddatetime"),
+}
+
+
+class FixtureMissing(Exception):
+    """Replay mode and no fixture recorded for this request."""
+
+
+# -------------------------------------------------
+# FIXTURE FILES
+# -------------------------------------------------
+def _normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def _key_url(url: str) -> str:
+    parts = urlsplit(url)
+    volatile = VOLATILE_PARAMS.get(parts.hostname or "", ())
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in volatile))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def fixture_path(method: str, url: str, body: Optional[bytes]) -> Path:
+    url = _key_url(url)
+    digest = hashlib.sha1(f"{method.upper()} {url}\n".encode() + (body or b"")).hexdigest()[:16]
+    return FIXTURE_DIR / (urlsplit(url).hostname or "unknown") / f"{digest}.json"
+
+
+def save(method: str, url: str, body: Optional[bytes], status: int,
+         headers, content: bytes, elapsed: float):
+    path = fixture_path(method, url, body)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fixture = {
+        "version": FIXTURE_VERSION,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "request": {"method": method.upper(), "url": _normalize_url(url)},
+        "response": {
+            "status": status,
+            "headers": {k: headers[k] for k in KEEP_HEADERS if k in headers},
+            "body_b64": base64.b64encode(content).decode("ascii"),
+            "elapsed_s": round(elapsed, 4),
+        },
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(fixture, indent=1), encoding="utf-8")
+    tmp.replace(path)
+
+
+def load(method: str, url: str, body: Optional[bytes]) -> Tuple[int, Dict, bytes, float]:
+    """(status, headers, content, recorded elapsed seconds) of a recorded response."""
+    path = fixture_path(method, url, body)
+    if not path.exists():
+        raise FixtureMissing(f"No fixture for {method.upper()} {_normalize_url(url)} ({path})")
+    fixture = json.loads(path.read_text(encoding="utf-8"))
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise FixtureMissing(f"{path} is fixture version {fixture.get('version')}, expected {FIXTURE_VERSION}")
+    response = fixture["response"]
+    return (
+        response["status"],
+        response["headers"],
+        base64.b64decode(response["body_b64"]),
+        response.get("elapsed_s", 0.0),
+    )
+
+
+def replay_delay(recorded: float) -> float:
+    if REPLAY_LATENCY == "recorded":
+        return recorded
+    try:
+        return float(REPLAY_LATENCY)
+    except ValueError:
+        return 0.0
+
+
+# -------------------------------------------------
+# requests (sync)
+# -------------------------------------------------
+def _prepared_body(request: requests.PreparedRequest) -> Optional[bytes]:
+    body = request.body
+    return body.encode() if isinstance(body, str) else body
+
+
+class RecordingAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        save(request.method, request.url, _prepared_body(request), response.status_code,
+             response.headers, response.content, time.perf_counter() - start)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        status, headers, content, recorded = load(request.method, request.url, _prepared_body(request))
+        time.sleep(replay_delay(recorded))
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content
+        response.url = request.url
+        response.request = request
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        return response
+
+
+def make_adapter(**pool_kwargs) -> HTTPAdapter:
+    """Connection-pooling adapter for the shared requests.Session in the current MODE."""
+    adapter_cls = {RECORD: RecordingAdapter, REPLAY: ReplayAdapter}.get(MODE, HTTPAdapter)
+    return adapter_cls(**pool_kwargs)
+
+
+# -------------------------------------------------
+# httpx (async)
+# -------------------------------------------------
+class RecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        start = time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        save(request.method, str(request.url), body, response.status_code,
+             response.headers, content, time.perf_counter() - start)
+        return response
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        status, headers, content, recorded = load(request.method, str(request.url), body)
+        delay = replay_delay(recorded)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(status, headers=headers, content=content, request=request)
+
+
+def make_async_transport(limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+    """Transport for a new AsyncClient in the current MODE (None: httpx default)."""
+    if MODE == RECORD:
+        return RecordingTransport(httpx.AsyncHTTPTransport(limits=limits))
+    if MODE == REPLAY:
+        return ReplayTransport()
+    return None
@@ -0,0 +1,120 @@
+"""
+Small geo utilities shared by the tools: great-circle distance (scalar
+and batch) and a uniform-grid spatial index for nearest-neighbour
+lookups over a fixed set of points (monitoring stations, ZIP centroids,
+...).
+"""
+import math
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional: pure-Python fallback below
+    np = None
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEG_LAT = 111.19
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance between two coordinates in km (Haversine formula)."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_many(lat: float, lon: float, lats: Sequence[float], lons: Sequence[float]) -> List[float]:
+    """Distances in km from one point to many, in one pass (NumPy when available)."""
+    if not len(lats):
+        return []
+
+    if np is not None:
+        lat1, lon1 = math.radians(lat), math.radians(lon)
+        lat2 = np.radians(np.asarray(lats, dtype=float))
+        lon2 = np.radians(np.asarray(lons, dtype=float))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return (2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))).tolist()
+
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    cos_lat1 = math.cos(lat1)
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    out = []
+    for plat, plon in zip(lats, lons):
+        lat2, lon2 = radians(plat), radians(plon)
+        a = sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+        out.append(2 * EARTH_RADIUS_KM * asin(sqrt(min(a, 1.0))))
+    return out
+
+
+class GridIndex:
+    """Points bucketed into cell_deg x cell_deg cells.
+
+    nearest() searches rings of cells outward from the query cell and stops
+    as soon as no unseen cell can hold anything closer than what it has.
+    """
+
+    def __init__(self, cell_deg: float = 0.25):
+        self.cell_deg = cell_deg
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Any]]] = defaultdict(list)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def add(self, lat: float, lon: float, item: Any):
+        self._cells[self._cell(lat, lon)].append((lat, lon, item))
+        self._size += 1
+
+    def bulk_load(self, points: Iterable[Tuple[float, float, Any]]):
+        for lat, lon, item in points:
+            self.add(lat, lon, item)
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                max_km: Optional[float] = None) -> List[Tuple[float, Any]]:
+        """Up to k (distance_km, item) pairs, closest first."""
+        if not self._size:
+            return []
+
+        # Smallest cell width around the query, so ring bounds stay conservative
+        edge_lat = min(abs(lat) + self.cell_deg, 89.9)
+        cell_km = self.cell_deg * KM_PER_DEG_LAT * math.cos(math.radians(edge_lat))
+        max_ring = int(360 / self.cell_deg)
+        if max_km is not None:
+            max_ring = min(max_ring, math.ceil(max_km / cell_km) + 1)
+
+        ci, cj = self._cell(lat, lon)
+        found: List[Tuple[float, Any]] = []
+        seen = 0
+        for ring in range(max_ring + 1):
+            # Anything in this ring is at least (ring - 1) cells away
+            if len(found) >= k and (ring - 1) * cell_km > found[k - 1][0]:
+                break
+            if seen == self._size:
+                break
+            for i, j in _ring_cells(ci, cj, ring):
+                for plat, plon, item in self._cells.get((i, j), ()):
+                    seen += 1
+                    d = haversine_km(lat, lon, plat, plon)
+                    if max_km is None or d <= max_km:
+                        found.append((d, item))
+            found.sort(key=lambda x: x[0])
+
+        return found[:k]
+
+
+def _ring_cells(ci: int, cj: int, ring: int):
+    if ring == 0:
+        yield ci, cj
+        return
+    for dj in range(-ring, ring + 1):
+        yield ci - ring, cj + dj
+        yield ci + ring, cj + dj
+    for di in range(-ring + 1, ring):
+        yield ci + di, cj - ring
+        yield ci + di, cj + ring
@@ -0,0 +1,127 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .store import TTLStore
+
+Coords = Tuple[float, float]
+
+POSITIVE_TTL = 30 * 24 * 3600   # cities don't move
+NEGATIVE_TTL = 24 * 3600        # but a typo today may be a new place tomorrow
+
+# Sidebar cities from app.py, resolved once with the Open-Meteo geocoder.
+# These never need a network round trip.
+SEED_COORDS: Dict[str, Coords] = {
+    "New York": (40.71427, -74.00597),
+    "Boston": (42.35843, -71.05977),
+    "Miami": (25.77427, -80.19366),
+    "San Francisco": (37.77493, -122.41942),
+    "Los Angeles": (34.05223, -118.24368),
+    "Chicago": (41.85003, -87.65005),
+    "Houston": (29.76328, -95.36327),
+    "Seattle": (47.60621, -122.33207),
+    "Dallas": (32.78306, -96.80667),
+    "Austin": (30.26715, -97.74306),
+    "Portland": (45.52345, -122.67621),
+    "Denver": (39.73915, -104.9847),
+}
+
+_MISSING = "__missing__"
+
+
+def normalize_city(name: str) -> str:
+    """Normalize a place name into a cache key ("  new   YORK. " -> "new york")."""
+    key = unicodedata.normalize("NFKC", name).casefold()
+    key = re.sub(r"\s+", " ", key)
+    return key.strip(" \t.,;:!?\"'")
+
+
+class GeoCache:
+    """Geocoding cache: pinned seeds, then an in-process LRU, then SQLite.
+
+    Unknown names are cached too (negative caching) so repeated lookups
+    for a bad name don't keep hitting the geocoder.
+    """
+
+    def __init__(self, store: Optional[TTLStore] = None, maxsize: int = 1024):
+        self.store = store or TTLStore("geocode")
+        self.maxsize = maxsize
+        self._pinned = {normalize_city(k): v for k, v in SEED_COORDS.items()}
+        # key -> (coords, expires_at); expiry mirrors the SQLite row's
+        self._lru: "OrderedDict[str, Tuple[Optional[Coords], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.negative_hits = 0
+
+    def lookup(self, name: str) -> Tuple[bool, Optional[Coords]]:
+        """Return (hit, coords). A hit with coords=None means "known unknown"."""
+        key = normalize_city(name)
+
+        with self._lock:
+            if key in self._pinned:
+                self.hits += 1
+                return True, self._pinned[key]
+            if key in self._lru:
+                coords, expires_at = self._lru[key]
+                if expires_at >= time.time():
+                    self._lru.move_to_end(key)
+                    self.hits += 1
+                    if coords is None:
+                        self.negative_hits += 1
+                    return True, coords
+                del self._lru[key]
+
+        found, value, expires_at = self.store.get_entry(key)
+        if not found:
+            with self._lock:
+                self.misses += 1
+            return False, None
+
+        coords = None if value == _MISSING else (value[0], value[1])
+        with self._lock:
+            self._remember(key, coords, expires_at)
+            self.hits += 1
+            self.disk_hits += 1
+            if coords is None:
+                self.negative_hits += 1
+        return True, coords
+
+    def put(self, name: str, coords: Optional[Coords]):
+        """Cache a geocoding result; pass None to record an unknown name."""
+        key = normalize_city(name)
+        ttl = NEGATIVE_TTL if coords is None else POSITIVE_TTL
+        self.store.set(key, _MISSING if coords is None else list(coords), ttl)
+        with self._lock:
+            self._remember(key, coords, time.time() + ttl)
+
+    def clear(self):
+        """Forget in-process entries (pinned seeds stay; the SQLite store is separate)."""
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "negative_hits": self.negative_hits,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+                "lru_size": len(self._lru),
+                "pinned": len(self._pinned),
+            }
+
+    def _remember(self, key: str, coords: Optional[Coords], expires_at: float):
+        self._lru[key] = (coords, expires_at)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+
+geocache = GeoCache()
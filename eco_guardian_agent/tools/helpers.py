@@ -1,24 +1,115 @@
-import requests
+import logging
 
-def get_coords(city: str):
-    """Geocode city using Open-Meteo (free, fast, no key)."""
-    geo_url = "https://geocoding-api.open-meteo.com/v1/search"
-    resp = requests.get(geo_url, params={"name": city, "count": 1}).json()
+from . import http_client
+from .geocache import geocache, normalize_city
+from .singleflight import SingleFlight
+from .store import TTLStore
+from .zipcodes import zip_resolver
+
+GEO_URL = "https://geocoding-api.open-meteo.com/v1/search"
+NOMINATIM_REVERSE_URL = "https://nominatim.openstreetmap.org/reverse"
+
+# Nominatim answers are cached so each spot costs at most one rate-limited call
+ZIP_TTL = 30 * 24 * 3600
+_zip_cache = TTLStore("reverse_zip")
+
+logger = logging.getLogger("ecoguardian")
 
-    if "results" not in resp or not resp["results"]:
+_geocode_flights = SingleFlight("geocode")
+_zip_flights = SingleFlight("reverse_zip")
+
+
+def _remember_geocode(city: str, response):
+    """Parse a geocoder response; cache hits, and misses only when the answer is well-formed.
+
+    Rate-limit, 5xx and other error payloads are not an answer about the
+    city, so they are never cached as "unknown". (Open-Meteo leaves out
+    "results" entirely when nothing matched.)
+    """
+    if response.status_code != 200:
+        logger.warning("geocoding %s failed: HTTP %s", city, response.status_code)
+        return None, None
+    try:
+        resp = response.json()
+    except ValueError:
+        logger.warning("geocoding %s failed: response is not JSON", city)
+        return None, None
+    if not isinstance(resp, dict) or resp.get("error") or not isinstance(resp.get("results", []), list):
+        logger.warning("geocoding %s failed: %s", city, resp)
+        return None, None
+
+    if not resp.get("results"):
+        geocache.put(city, None)
         return None, None
 
     r = resp["results"][0]
+    geocache.put(city, (r["latitude"], r["longitude"]))
     return r["latitude"], r["longitude"]
 
-def get_zip_from_coords(lat, lon):
-    """Reverse geocode coordinates → ZIP code."""
-    url = "https://nominatim.openstreetmap.org/reverse"
-    resp = requests.get(url, params={
-        "lat": lat,
-        "lon": lon,
-        "format": "json"
-    }, headers={"User-Agent": "EcoGuardian/1.0"}).json()
-
-    address = resp.get("address", {})
-    return address.get("postcode")
+
+def get_coords(city: str):
+    """Geocode city using Open-Meteo (free, fast, no key), cached."""
+    hit, coords = geocache.lookup(city)
+    if hit:
+        return coords if coords else (None, None)
+
+    return _remember_geocode(city, http_client.get(GEO_URL, params={"name": city, "count": 1}))
+
+
+async def get_coords_async(city: str):
+    """Async get_coords(); shares the same cache."""
+    hit, coords = geocache.lookup(city)
+    if hit:
+        return coords if coords else (None, None)
+
+    async def fetch():
+        return _remember_geocode(city, await http_client.aget(GEO_URL, params={"name": city, "count": 1}))
+
+    return await _geocode_flights.do(normalize_city(city), fetch)
+
+
+def _zip_cache_key(lat, lon) -> str:
+    return f"{lat:.3f},{lon:.3f}"
+
+
+def _local_zip(lat, lon):
+    """Bundled ZIP table first, then earlier Nominatim answers."""
+    if zipcode := zip_resolver.nearest(lat, lon):
+        return True, zipcode
+    return _zip_cache.get(_zip_cache_key(lat, lon))
+
+
+def _remember_zip(lat, lon, response):
+    """Parse a Nominatim reverse response; cache the postcode if there is one."""
+    if response.status_code != 200:
+        logger.warning("reverse geocoding %s,%s failed: HTTP %s", lat, lon, response.status_code)
+        return None
+    try:
+        resp = response.json()
+    except ValueError:
+        logger.warning("reverse geocoding %s,%s failed: response is not JSON", lat, lon)
+        return None
+    if not isinstance(resp, dict):
+        return None
+
+    zipcode = resp.get("address", {}).get("postcode")
+    if zipcode:
+        _zip_cache.set(_zip_cache_key(lat, lon), zipcode, ZIP_TTL)
+    return zipcode
+
+
+async def get_zip_from_coords_async(lat, lon):
+    """Coordinates → ZIP code (offline table, falling back to Nominatim)."""
+    found, zipcode = _local_zip(lat, lon)
+    if found:
+        return zipcode
+
+    async def fetch():
+        return _remember_zip(lat, lon, await http_client.aget(NOMINATIM_REVERSE_URL, params={
+            "lat": lat,
+            "lon": lon,
+            "format": "json"
+        }))
+
+    # Nominatim allows 1 req/s: never send the same lookup twice at once
+    return await _zip_flights.do(_zip_cache_key(lat, lon), fetch)
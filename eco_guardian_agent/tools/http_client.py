@@ -0,0 +1,215 @@
+"""
+Shared HTTP clients for all provider tools.
+
+One requests.Session (sync) and one httpx.AsyncClient per event loop
+(async), both with per-host connection pools (keep-alive), default
+connect/read timeouts and gzip, so warm calls to Open-Meteo, Nominatim,
+OpenAQ, Overpass, etc. reuse an open TCP+TLS connection.
+
+Requests to known providers go through their rate limiter and circuit
+breaker (providers.py) and may raise ProviderUnavailable without being
+sent. ECOGUARDIAN_HTTP_MODE=record/replay swaps the transports for the
+fixture recorder/replayer (fixtures.py). Every call is timed and
+counted in metrics.py.
+"""
+import asyncio
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+from . import fixtures, metrics
+from .providers import provider_for
+
+# (connect, read) seconds. Tools that talk to slow providers pass their own.
+DEFAULT_TIMEOUT = (3.05, 15)
+
+# Hosts kept in the pool manager, and connections kept per host
+POOL_HOSTS = 16
+POOL_MAXSIZE = 10
+
+DEFAULT_HEADERS = {
+    "User-Agent": "EcoGuardian/1.0",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_adapter = fixtures.make_adapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_MAXSIZE)
+
+session = requests.Session()
+session.headers.update(DEFAULT_HEADERS)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+_lock = threading.Lock()
+_requests_per_host = Counter()
+
+
+def _count(url: str):
+    with _lock:
+        _requests_per_host[urlsplit(url).hostname] += 1
+
+
+def _provider(url: str):
+    # Replayed responses don't touch the provider, so don't rate limit them
+    return None if fixtures.MODE == fixtures.REPLAY else provider_for(url)
+
+
+def _provider_name(provider, url: str) -> str:
+    return provider.name if provider is not None else (urlsplit(url).hostname or "unknown")
+
+
+def _finish(method: str, url: str, provider, start: float, response=None, error=None):
+    """Feed a request's outcome to its provider's breaker and to metrics."""
+    if provider is not None:
+        if response is not None:
+            provider.record(response.status_code, response.headers)
+        elif isinstance(error, (requests.RequestException, httpx.HTTPError)):
+            provider.record(error=error)
+    metrics.observe_http(
+        _provider_name(provider, url),
+        method,
+        time.perf_counter() - start,
+        status=response.status_code if response is not None else None,
+        size=len(response.content) if response is not None else None,
+        error=error,
+    )
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the shared session (default timeouts applied)."""
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    provider = _provider(url)
+    probe = False
+    if provider is not None:
+        start = time.perf_counter()
+        probe = provider.acquire()
+        metrics.observe_wait(provider.name, time.perf_counter() - start)
+
+    _count(url)
+    start = time.perf_counter()
+    try:
+        response = session.request(method, url, **kwargs)
+    except Exception as e:
+        _finish(method, url, provider, start, error=e)
+        raise
+    else:
+        _finish(method, url, provider, start, response=response)
+    finally:
+        # Nothing recorded (non-transport error, cancellation): don't hold the probe
+        if probe:
+            provider.breaker.release_probe()
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Async client: one per event loop (httpx clients can't cross loops)
+# ---------------------------------------------------------------------------
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _httpx_timeout(timeout) -> httpx.Timeout:
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Pooled AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        limits = httpx.Limits(
+            max_connections=POOL_HOSTS * POOL_MAXSIZE,
+            max_keepalive_connections=POOL_HOSTS * POOL_MAXSIZE,
+        )
+        client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            timeout=_httpx_timeout(DEFAULT_TIMEOUT),
+            limits=limits,
+            transport=fixtures.make_async_transport(limits),
+            follow_redirects=True,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def arequest(method: str, url: str, **kwargs) -> httpx.Response:
+    """Async counterpart of request(); accepts the same timeout tuples."""
+    kwargs["timeout"] = _httpx_timeout(kwargs.get("timeout", DEFAULT_TIMEOUT))
+    provider = _provider(url)
+    probe = False
+    if provider is not None:
+        start = time.perf_counter()
+        probe = await provider.acquire_async()
+        metrics.observe_wait(provider.name, time.perf_counter() - start)
+
+    _count(url)
+    start = time.perf_counter()
+    try:
+        response = await get_async_client().request(method, url, **kwargs)
+    except Exception as e:
+        _finish(method, url, provider, start, error=e)
+        raise
+    else:
+        _finish(method, url, provider, start, response=response)
+    finally:
+        # Nothing recorded (non-transport error, cancellation): don't hold the probe
+        if probe:
+            provider.breaker.release_probe()
+    return response
+
+
+async def aget(url: str, **kwargs) -> httpx.Response:
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs) -> httpx.Response:
+    return await arequest("POST", url, **kwargs)
+
+
+def pool_stats() -> Dict:
+    """Per-host pool usage: requests sent, connections opened, idle connections."""
+    pools = _adapter.poolmanager.pools
+    hosts = {}
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        hosts[key.key_host] = {
+            "connections_opened": pool.num_connections,
+            "requests_on_pool": pool.num_requests,
+            "idle_connections": pool.pool.qsize() if pool.pool else 0,
+        }
+
+    with _lock:
+        sent = dict(_requests_per_host)
+
+    for host, count in sent.items():
+        hosts.setdefault(host, {})["requests_sent"] = count
+
+    async_connections = 0
+    for client in list(_async_clients.values()):
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        async_connections += len(getattr(pool, "connections", []))
+
+    return {
+        "pool_hosts": POOL_HOSTS,
+        "pool_maxsize": POOL_MAXSIZE,
+        "hosts": hosts,
+        "async_clients": len(_async_clients),
+        "async_connections": async_connections,
+    }
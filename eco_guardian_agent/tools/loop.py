@@ -0,0 +1,52 @@
+"""
+Long-lived asyncio loop in a daemon thread.
+
+Lets synchronous code (scripts, the sync tool wrappers) run coroutines
+without asyncio.run(), so the pooled async HTTP client bound to that loop
+is reused between calls.
+"""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Coroutine, Optional
+
+
+class BackgroundLoop:
+    """An event loop running forever in its own thread."""
+
+    def __init__(self, name: str = "ecoguardian-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine from any thread; returns a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Block the calling thread until the coroutine finishes."""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() called from its own loop thread; await instead")
+        return self.submit(coro).result(timeout)
+
+
+_default: Optional[BackgroundLoop] = None
+_default_lock = threading.Lock()
+
+
+def default_loop() -> BackgroundLoop:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = BackgroundLoop()
+        return _default
+
+
+def run_sync(coro: Coroutine, timeout: Optional[float] = None) -> Any:
+    """Run a coroutine to completion from synchronous code."""
+    return default_loop().run(coro, timeout)
@@ -0,0 +1,349 @@
+"""
+In-process metrics for tools and outbound HTTP.
+
+- tool calls: latency histogram by tool and outcome, result size in tokens
+- HTTP calls: latency, limiter wait and payload size histograms, plus
+  status code / error counters, by provider
+- cache, geocoder, HTTP pool, single-flight and provider state, read
+  at dump time; the
+  breaker is ecoguardian_provider_circuit_state{state=...}, 1 for the
+  current state (closed / half_open / open) and 0 for the others
+
+render_prometheus() / render_json() dump everything. Set
+ECOGUARDIAN_METRICS_PORT to also serve them on
+http://127.0.0.1:<port>/metrics (Prometheus text) and /metrics.json.
+
+debug_sample() replaces ad-hoc payload prints: a structured one-line
+JSON debug log for a sampled fraction (ECOGUARDIAN_DEBUG_SAMPLE) of
+events, and only when the "ecoguardian" logger is at DEBUG.
+"""
+import bisect
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+SAMPLE_RATE = float(os.getenv("ECOGUARDIAN_DEBUG_SAMPLE", "0.05"))
+
+logger = logging.getLogger("ecoguardian")
+
+# "# HELP" text per metric family (Prometheus exposition)
+HELP = {
+    "ecoguardian_http_request_seconds": "Outbound HTTP request latency, by provider and method.",
+    "ecoguardian_http_response_bytes": "Outbound HTTP response body size, by provider.",
+    "ecoguardian_http_limiter_wait_seconds": "Time a request queued for its provider's rate limiter.",
+    "ecoguardian_http_responses": "Outbound HTTP responses, by provider and status code.",
+    "ecoguardian_http_errors": "Outbound HTTP requests that got no response, by provider and error type.",
+    "ecoguardian_tool_seconds": "Tool call latency, by tool and outcome.",
+    "ecoguardian_tool_result_tokens": "Estimated size of a tool result in LLM tokens.",
+    "ecoguardian_cache_size": "Entries in a tool result cache.",
+    "ecoguardian_cache_hits": "Fresh hits of a tool result cache since start.",
+    "ecoguardian_cache_stale_hits": "Stale hits (served while refreshing) since start.",
+    "ecoguardian_cache_misses": "Misses of a tool result cache since start.",
+    "ecoguardian_cache_refreshes": "Completed background refreshes since start.",
+    "ecoguardian_cache_evictions": "LRU evictions since start.",
+    "ecoguardian_cache_outage_hits": "Expired entries served because the provider was unavailable.",
+    "ecoguardian_cache_hit_ratio": "Fresh plus stale hits over all lookups.",
+    "ecoguardian_geocode_hits": "Geocoder lookups answered from memory or disk since start.",
+    "ecoguardian_geocode_misses": "Geocoder lookups that went to Nominatim since start.",
+    "ecoguardian_geocode_disk_hits": "Geocoder hits read from the on-disk store.",
+    "ecoguardian_geocode_negative_hits": "Geocoder hits on a cached \"not found\".",
+    "ecoguardian_geocode_hit_ratio": "Geocoder hits over all lookups.",
+    "ecoguardian_geocode_lru_size": "Entries in the geocoder's in-memory LRU.",
+    "ecoguardian_http_pool_connections_opened": "Connections the sync pool opened to a host since start.",
+    "ecoguardian_http_pool_requests": "Requests sent through a host's sync pool since start.",
+    "ecoguardian_http_pool_idle_connections": "Idle connections in a host's sync pool now.",
+    "ecoguardian_http_async_connections": "Open connections across the async clients now.",
+    "ecoguardian_singleflight_calls": "Calls into a single-flight group since start.",
+    "ecoguardian_singleflight_executions": "Calls that ran the underlying work.",
+    "ecoguardian_singleflight_coalesced": "Calls that shared another call's result.",
+    "ecoguardian_singleflight_in_flight": "Keys currently being computed.",
+    "ecoguardian_provider_circuit_state": "Circuit breaker state: 1 for the current state label, 0 for the others.",
+    "ecoguardian_provider_tokens": "Rate limiter tokens available now.",
+    "ecoguardian_provider_waiting": "Requests queued for the rate limiter now.",
+    "ecoguardian_provider_rejected": "Requests rejected by the limiter or breaker since start.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for upper, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return upper
+        return float("inf")
+
+
+class Registry:
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+registry = Registry()
+
+
+def debug_sample(event: str, **fields):
+    """Structured debug line for a sampled fraction of events."""
+    if SAMPLE_RATE <= 0 or not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() < SAMPLE_RATE:
+        logger.debug(json.dumps({"event": event, **fields}, default=str))
+
+
+# -------------------------------------------------
+# HTTP
+# -------------------------------------------------
+def observe_http(provider: str, method: str, seconds: float, status: Optional[int] = None,
+                 size: Optional[int] = None, error: Optional[BaseException] = None):
+    registry.observe("ecoguardian_http_request_seconds", seconds, provider=provider, method=method)
+    if error is not None:
+        registry.inc("ecoguardian_http_errors", provider=provider, error=type(error).__name__)
+    else:
+        registry.inc("ecoguardian_http_responses", provider=provider, status=status)
+    if size is not None:
+        registry.observe("ecoguardian_http_response_bytes", size, SIZE_BUCKETS, provider=provider)
+    debug_sample("http", provider=provider, method=method, status=status, bytes=size,
+                 ms=round(seconds * 1000, 1), error=repr(error) if error else None)
+
+
+def observe_wait(provider: str, seconds: float):
+    registry.observe("ecoguardian_http_limiter_wait_seconds", seconds, provider=provider)
+
+
+# -------------------------------------------------
+# TOOLS
+# -------------------------------------------------
+def _outcome(result) -> str:
+    if isinstance(result, dict):
+        if result.get("served_stale"):
+            return "stale"
+        return str(result.get("status", "success"))
+    return "success"
+
+
+def _record_tool(name: str, start: float, result=None, error: Optional[BaseException] = None):
+    seconds = time.perf_counter() - start
+    outcome = "exception" if error is not None else _outcome(result)
+    registry.observe("ecoguardian_tool_seconds", seconds, tool=name, outcome=outcome)
+    if isinstance(result, dict) and "result_tokens_est" in result:
+        registry.observe("ecoguardian_tool_result_tokens", result["result_tokens_est"], TOKEN_BUCKETS, tool=name)
+    debug_sample("tool", tool=name, outcome=outcome, ms=round(seconds * 1000, 1),
+                 error=repr(error) if error else None)
+
+
+def timed_tool(name: str):
+    """Decorator: latency / outcome / result size metrics for a tool (sync or async)."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    _record_tool(name, start, error=e)
+                    raise
+                _record_tool(name, start, result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _record_tool(name, start, error=e)
+                raise
+            _record_tool(name, start, result)
+            return result
+        return wrapper
+    return decorator
+
+
+# -------------------------------------------------
+# DUMP
+# -------------------------------------------------
+def _gauges() -> List[Tuple[str, Labels, float]]:
+    """Point-in-time state owned by other modules (imported lazily)."""
+    from .cache import cache_stats
+    from .geocache import geocache
+    from .http_client import pool_stats
+    from .providers import CLOSED, HALF_OPEN, OPEN, registry_state
+    from .singleflight import flight_stats
+
+    gauges = []
+    for name, stats in cache_stats().items():
+        for field in ("size", "hits", "stale_hits", "misses", "refreshes", "evictions", "outage_hits", "hit_ratio"):
+            gauges.append((f"ecoguardian_cache_{field}", (("cache", name),), stats[field]))
+    geo = geocache.stats()
+    for field in ("hits", "misses", "disk_hits", "negative_hits", "hit_ratio", "lru_size"):
+        gauges.append((f"ecoguardian_geocode_{field}", (), geo[field]))
+    pools = pool_stats()
+    for host, stats in pools["hosts"].items():
+        for field, name in (("connections_opened", "connections_opened"), ("requests_on_pool", "requests"),
+                            ("idle_connections", "idle_connections")):
+            if field in stats:
+                gauges.append((f"ecoguardian_http_pool_{name}", (("host", host),), stats[field]))
+    gauges.append(("ecoguardian_http_async_connections", (), pools["async_connections"]))
+    for name, stats in flight_stats().items():
+        for field in ("calls", "executions", "coalesced", "in_flight"):
+            gauges.append((f"ecoguardian_singleflight_{field}", (("group", name),), stats[field]))
+    for name, state in registry_state().items():
+        labels = (("provider", name),)
+        for circuit in (CLOSED, HALF_OPEN, OPEN):
+            gauges.append(("ecoguardian_provider_circuit_state", labels + (("state", circuit),),
+                           int(state["circuit"] == circuit)))
+        for field in ("tokens", "waiting", "rejected"):
+            gauges.append((f"ecoguardian_provider_{field}", labels, state[field]))
+    return gauges
+
+
+def _fmt_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def _family(lines: List[str], seen: set, name: str, kind: str, help_name: Optional[str] = None):
+    """Emit "# HELP" / "# TYPE" once, before a family's first sample."""
+    if name in seen:
+        return
+    seen.add(name)
+    lines.append(f"# HELP {name} {HELP.get(help_name or name, name)}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    seen: set = set()
+    with registry._lock:
+        histograms = sorted(registry.histograms.items())
+        counters = sorted(registry.counters.items())
+        for (name, labels), hist in histograms:
+            _family(lines, seen, name, "histogram")
+            cumulative = 0
+            for upper, n in zip(hist.buckets + (float("inf"),), hist.counts):
+                cumulative += n
+                le = "+Inf" if upper == float("inf") else repr(upper)
+                lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {hist.sum}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {hist.count}")
+    for (name, labels), value in counters:
+        _family(lines, seen, f"{name}_total", "counter", name)
+        lines.append(f"{name}_total{_fmt_labels(labels)} {value}")
+    for name, labels, value in sorted(_gauges(), key=lambda g: g[0]):
+        _family(lines, seen, name, "gauge")
+        lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def render_json() -> Dict:
+    with registry._lock:
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": hist.count,
+                "sum": round(hist.sum, 6),
+                "p50": hist.quantile(0.5),
+                "p95": hist.quantile(0.95),
+                "p99": hist.quantile(0.99),
+            }
+            for (name, labels), hist in sorted(registry.histograms.items())
+        ]
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(registry.counters.items())
+        ]
+    gauges = [{"name": name, "labels": dict(labels), "value": value} for name, labels, value in _gauges()]
+    return {"histograms": histograms, "counters": counters, "gauges": gauges}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = render_prometheus().encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(render_json(), default=str).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics and /metrics.json from a daemon thread (once per process)."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _Handler)
+            threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+        return _server
+
+
+if port := os.getenv("ECOGUARDIAN_METRICS_PORT"):
+    try:
+        serve(int(port), os.getenv("ECOGUARDIAN_METRICS_HOST", "127.0.0.1"))
+    except (OSError, ValueError) as e:
+        logger.error("could not start metrics server on port %s: %s", port, e)
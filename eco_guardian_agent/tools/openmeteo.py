@@ -0,0 +1,216 @@
+"""
+Open-Meteo "environment snapshot" for one coordinate.
+
+Weather, UV and modelled air quality all come from Open-Meteo, split
+across two hosts. A snapshot fetches every variable the tools need in
+one request per host (run concurrently) and keeps the result for a few
+minutes, so get_weather / get_uv_index / get_air_quality for the same
+place share it instead of each calling upstream.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import http_client
+from .cache import current_max_age
+from .compact import finalize
+from .helpers import get_coords_async
+from .singleflight import SingleFlight
+
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+AIR_QUALITY_URL = "https://air-quality-api.open-meteo.com/v1/air-quality"
+
+# Open-Meteo refreshes "current" values every 15 minutes
+SNAPSHOT_TTL = 600
+
+# Snapshots kept in memory (LRU), about 10 KB each
+MAX_SNAPSHOTS = 1024
+
+# Coordinates per multi-location request (keeps URLs a sane length)
+BATCH_SIZE = 50
+
+WEATHER_CURRENT = [
+    "temperature_2m",
+    "relative_humidity_2m",
+    "wind_speed_10m",
+    "wind_direction_10m",
+    "precipitation",
+    "weather_code",
+    "cloud_cover",
+]
+UV_HOURLY = ["uv_index", "uv_index_clear_sky"]
+AIR_CURRENT = [
+    "us_aqi",
+    "pm2_5",
+    "pm10",
+    "ozone",
+    "nitrogen_dioxide",
+    "sulphur_dioxide",
+    "carbon_monoxide",
+]
+
+_snapshots: "OrderedDict[Tuple[float, float], Dict]" = OrderedDict()
+_lock = threading.Lock()
+_flights = SingleFlight("openmeteo")
+
+
+def _key(lat: float, lon: float) -> Tuple[float, float]:
+    return round(lat, 4), round(lon, 4)
+
+
+def forecast_params(lat, lon) -> Dict:
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current": ",".join(WEATHER_CURRENT),
+        "hourly": ",".join(UV_HOURLY),
+        "timezone": "auto",
+    }
+
+
+def air_quality_params(lat, lon) -> Dict:
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current": ",".join(AIR_CURRENT),
+        "timezone": "auto",
+    }
+
+
+def _cached(key) -> Optional[Dict]:
+    with _lock:
+        snap = _snapshots.get(key)
+        if snap is None:
+            return None
+        age = time.time() - snap["fetched_at"]
+        if age >= SNAPSHOT_TTL:
+            del _snapshots[key]
+            return None
+        if (limit := current_max_age()) is not None and age >= limit:
+            return None
+        _snapshots.move_to_end(key)
+        return snap
+
+
+def _store(key, forecast: Dict, air_quality: Dict) -> Dict:
+    snap = {
+        "lat": key[0],
+        "lon": key[1],
+        "fetched_at": time.time(),
+        "forecast": forecast,
+        "air_quality": air_quality,
+    }
+    # Don't keep a snapshot whose weather part failed
+    if "current" in forecast and "hourly" in forecast:
+        with _lock:
+            _snapshots[key] = snap
+            _snapshots.move_to_end(key)
+            while len(_snapshots) > MAX_SNAPSHOTS:
+                _snapshots.popitem(last=False)
+    return snap
+
+
+def _air_quality_payload(air_resp):
+    """Parsed air-quality answer, or an error payload; never raises (it's best effort)."""
+    if isinstance(air_resp, Exception):
+        return {"error": True, "reason": str(air_resp)}
+    try:
+        return air_resp.json()
+    except ValueError:
+        return {"error": True, "reason": f"HTTP {air_resp.status_code}, response is not JSON"}
+
+
+async def get_snapshot(lat: float, lon: float) -> Dict:
+    """All Open-Meteo data for a coordinate: two concurrent requests, cached."""
+    key = _key(lat, lon)
+    if snap := _cached(key):
+        return snap
+    return await _flights.do(key, lambda: _fetch_snapshot(key))
+
+
+async def _fetch_snapshot(key: Tuple[float, float]) -> Dict:
+    lat, lon = key
+    forecast_resp, air_resp = await asyncio.gather(
+        http_client.aget(FORECAST_URL, params=forecast_params(lat, lon)),
+        http_client.aget(AIR_QUALITY_URL, params=air_quality_params(lat, lon)),
+        return_exceptions=True,
+    )
+    # Weather is the primary payload; modelled air quality is best effort
+    if isinstance(forecast_resp, Exception):
+        raise forecast_resp
+    return _store(key, forecast_resp.json(), _air_quality_payload(air_resp))
+
+
+def _as_list(payload, n: int) -> List[Dict]:
+    # Open-Meteo answers a multi-coordinate request with a JSON list, but
+    # with a single object for one coordinate or for an error.
+    if isinstance(payload, list):
+        return payload
+    return [payload] * n
+
+
+async def get_snapshots_many(coords: List[Tuple[float, float]]) -> List[Dict]:
+    """Snapshots for many coordinates, one request per host per BATCH_SIZE.
+
+    Cached coordinates are served locally; the rest go out as one
+    comma-separated latitude/longitude request to each Open-Meteo host.
+    """
+    keys = [_key(lat, lon) for lat, lon in coords]
+    found = {k: snap for k in set(keys) if (snap := _cached(k))}
+    missing = [k for k in dict.fromkeys(keys) if k not in found]
+
+    for i in range(0, len(missing), BATCH_SIZE):
+        chunk = missing[i:i + BATCH_SIZE]
+        lats = ",".join(str(k[0]) for k in chunk)
+        lons = ",".join(str(k[1]) for k in chunk)
+
+        forecast_resp, air_resp = await asyncio.gather(
+            http_client.aget(FORECAST_URL, params=forecast_params(lats, lons)),
+            http_client.aget(AIR_QUALITY_URL, params=air_quality_params(lats, lons)),
+            return_exceptions=True,
+        )
+        if isinstance(forecast_resp, Exception):
+            raise forecast_resp
+        air_list = _as_list(_air_quality_payload(air_resp), len(chunk))
+        forecast_list = _as_list(forecast_resp.json(), len(chunk))
+
+        for key, forecast, air_quality in zip(chunk, forecast_list, air_list):
+            found[key] = _store(key, forecast, air_quality)
+
+    return [found[k] for k in keys]
+
+
+async def forecast_many(cities: List[str], build: Callable[[str, float, float, Dict], Dict],
+                        not_found: str, include_raw: bool = False) -> Dict[str, Dict]:
+    """build(city, lat, lon, forecast) for many cities over one batched fetch.
+
+    Keyed by city in input order; a city that can't be geocoded gets
+    {"status": "error", "message": not_found.format(city=city)}.
+    """
+    coords = await asyncio.gather(*(get_coords_async(c) for c in cities))
+    located = [(c, ll) for c, ll in zip(cities, coords) if ll[0] is not None]
+    snaps = {}
+    if located:
+        snaps = dict(zip((c for c, _ in located), await get_snapshots_many([ll for _, ll in located])))
+
+    results = {}
+    for city, (lat, lon) in zip(cities, coords):
+        if city in snaps:
+            result = build(city, lat, lon, snaps[city]["forecast"])
+        else:
+            result = {"status": "error", "message": not_found.format(city=city)}
+        results[city] = finalize(result, include_raw)
+    return results
+
+
+def invalidate(lat: float, lon: float):
+    """Drop the snapshot for a coordinate; the next call fetches upstream."""
+    with _lock:
+        _snapshots.pop(_key(lat, lon), None)
+
+
+def clear():
+    with _lock:
+        _snapshots.clear()
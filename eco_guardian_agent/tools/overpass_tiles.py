@@ -0,0 +1,193 @@
+"""
+Geohash-tiled cache of healthcare facilities from the Overpass API.
+
+Hospitals rarely move, and Overpass is slow and rate-limited, so
+facilities are cached per geohash cell. A radius query works out which
+cells cover the circle, fetches only the missing ones (one Overpass
+query over their combined bbox, with trimmed output), stores every cell
+with a long TTL and answers from the merged cells. Repeat lookups in the
+same metro need no network at all.
+"""
+import math
+from typing import Dict, List, Set, Tuple
+
+from . import http_client
+from .store import TTLStore
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+# Precision 5 cells are ~0.044° square (~4.9 km N-S)
+TILE_PRECISION = 5
+TILE_TTL = 30 * 24 * 3600
+
+# Tags the hospital finder actually reads
+KEEP_TAGS = ("name", "amenity", "addr:street", "addr:city", "phone", "emergency", "website")
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+_store = TTLStore("overpass_tiles")
+
+
+# -------------------------------------------------
+# GEOHASH
+# -------------------------------------------------
+def geohash_encode(lat: float, lon: float, precision: int = TILE_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch = (ch << 1) | 1
+                lon_lo = mid
+            else:
+                ch <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def geohash_bbox(geohash: str) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for c in geohash:
+        value = _BASE32.index(c)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def _cell_size(precision: int) -> Tuple[float, float]:
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def tiles_covering(lat: float, lon: float, radius_km: float,
+                   precision: int = TILE_PRECISION) -> List[str]:
+    """Geohash cells that together cover a circle of radius_km."""
+    dlat = radius_km / 111.19
+    dlon = radius_km / (111.19 * max(math.cos(math.radians(lat)), 0.01))
+    step_lat, step_lon = _cell_size(precision)
+
+    tiles: Set[str] = set()
+    y = lat - dlat
+    while y < lat + dlat + step_lat:
+        x = lon - dlon
+        while x < lon + dlon + step_lon:
+            tiles.add(geohash_encode(min(y, lat + dlat), min(x, lon + dlon), precision))
+            x += step_lon
+        y += step_lat
+    return sorted(tiles)
+
+
+# -------------------------------------------------
+# OVERPASS
+# -------------------------------------------------
+def bbox_query(south: float, west: float, north: float, east: float) -> str:
+    """Facilities inside a bbox. Ways print tags + center only (no node refs)."""
+    return f"""
+    [out:json][timeout:25][bbox:{south},{west},{north},{east}];
+    (
+      node["amenity"="hospital"];
+      node["amenity"="clinic"];
+      node["amenity"="doctors"];
+    );
+    out body;
+    (
+      way["amenity"="hospital"];
+      way["amenity"="clinic"];
+    );
+    out tags center;
+    """
+
+
+def facility_record(element: Dict) -> Dict:
+    """Trim an Overpass element to coordinates + the tags we use."""
+    if element.get("type") == "node":
+        lat, lon = element.get("lat"), element.get("lon")
+    else:
+        center = element.get("center", {})
+        lat, lon = center.get("lat"), center.get("lon")
+    tags = element.get("tags", {})
+    return {
+        "id": f'{element.get("type")}/{element.get("id")}',
+        "lat": lat,
+        "lon": lon,
+        "tags": {k: tags[k] for k in KEEP_TAGS if k in tags},
+    }
+
+
+async def _fetch_tiles(tiles: List[str]) -> Dict[str, List[Dict]]:
+    """One Overpass query over the combined bbox of tiles, bucketed per tile."""
+    boxes = [geohash_bbox(t) for t in tiles]
+    south = min(b[0] for b in boxes)
+    west = min(b[1] for b in boxes)
+    north = max(b[2] for b in boxes)
+    east = max(b[3] for b in boxes)
+
+    response = await http_client.apost(
+        OVERPASS_URL,
+        data={"data": bbox_query(south, west, north, east)},
+        timeout=(3.05, 30),
+    )
+    data = response.json()
+    remark = data.get("remark", "")
+    if "error" in remark.lower():
+        # Overpass reports timeouts/overload as a remark on a 200
+        raise RuntimeError(f"Overpass: {remark}")
+
+    wanted = set(tiles)
+    buckets: Dict[str, List[Dict]] = {t: [] for t in tiles}
+    for element in data.get("elements", []):
+        record = facility_record(element)
+        if record["lat"] is None or record["lon"] is None:
+            continue
+        tile = geohash_encode(record["lat"], record["lon"], len(tiles[0]))
+        if tile in wanted:
+            buckets[tile].append(record)
+    return buckets
+
+
+async def facilities_near(lat: float, lon: float, radius_m: float) -> List[Dict]:
+    """Facility records from every tile covering the radius (may reach a bit past it)."""
+    tiles = tiles_covering(lat, lon, radius_m / 1000)
+
+    facilities: List[Dict] = []
+    missing = []
+    for tile in tiles:
+        found, records = _store.get(f"{TILE_PRECISION}:{tile}")
+        if found:
+            facilities.extend(records)
+        else:
+            missing.append(tile)
+
+    if missing:
+        fetched = await _fetch_tiles(missing)
+        for tile, records in fetched.items():
+            _store.set(f"{TILE_PRECISION}:{tile}", records, TILE_TTL)
+            facilities.extend(records)
+
+    return facilities
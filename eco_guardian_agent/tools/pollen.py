@@ -1,16 +1,27 @@
-import requests
-from .helpers import get_coords, get_zip_from_coords
+from . import http_client
+from .cache import cached, location_key
+from .compact import compact_result, pollen_category
+from .helpers import get_coords_async, get_zip_from_coords_async
+from .loop import run_sync
+from .metrics import debug_sample, timed_tool
 
-def get_pollen(city: str):
-    """Fetch pollen levels (tree, grass, weed) using Pollen.com unofficial API."""
+
+@timed_tool("pollen")
+@compact_result
+@cached("pollen", key=location_key("city"))
+async def get_pollen_async(city: str, include_raw: bool = False):
+    """Fetch pollen levels (tree, grass, weed) using Pollen.com unofficial API.
+
+    Set include_raw=True only if the full pollen.com payload is really needed.
+    """
     
     # Step 1: Get lat/lon
-    lat, lon = get_coords(city)
+    lat, lon = await get_coords_async(city)
     if lat is None:
         return {"status": "error", "message": f"City not found: {city}"}
 
     # Step 2: Get ZIP code (required by pollen.com)
-    zipcode = get_zip_from_coords(lat, lon)
+    zipcode = await get_zip_from_coords_async(lat, lon)
     if not zipcode:
         return {"status": "error", "message": f"Cannot find ZIP code for city: {city}"}
 
@@ -23,8 +34,8 @@ def get_pollen(city: str):
         "Referer": "https://www.pollen.com",
     }
 
-    resp = requests.get(url, headers=headers).json()
-    print("[DEBUG] pollen.com response:", resp)
+    resp = (await http_client.aget(url, headers=headers)).json()
+    debug_sample("pollen.forecast", city=city, zipcode=zipcode, has_location="Location" in resp)
 
     if "Location" not in resp:
         return {"status": "error", "message": "Pollen data not available", "raw": resp}
@@ -48,8 +59,16 @@ def get_pollen(city: str):
         "zipcode": zipcode,
         "lat": lat,
         "lon": lon,
+        "period": primary.get("Type"),
+        "pollen_index": primary.get("Index"),
+        "category": pollen_category(primary.get("Index")),
         "tree_pollen": tree,
         "grass_pollen": grass,
         "weed_pollen": weed,
         "raw": resp
-    }
\ No newline at end of file
+    }
+
+
+def get_pollen(city: str, include_raw: bool = False):
+    """Sync wrapper around get_pollen_async() for scripts."""
+    return run_sync(get_pollen_async(city, include_raw))
@@ -0,0 +1,269 @@
+"""
+Per-provider rate limiting and circuit breaking.
+
+Every upstream host belongs to a Provider with:
+
+- a token bucket (rate/s, burst) sized to that provider's published or
+  observed limits; callers wait for a token, but only up to max_wait
+  seconds and with at most max_queue callers waiting,
+- a circuit breaker: after failure_threshold consecutive failures
+  (transport errors, 429, 5xx) the breaker opens and calls fail fast for
+  reset_timeout seconds, then a single probe decides whether to close it.
+
+http_client calls acquire() before each request and record() after it;
+if the call was the half-open probe and ended without a recordable
+outcome it releases the probe in a finally.
+A rejected call raises ProviderUnavailable straight away instead of
+burning seconds on a timeout; the result cache then serves its last
+known value where it has one.
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Retry-After fallback when a 429 doesn't say
+DEFAULT_RETRY_AFTER = 5.0
+
+
+class ProviderUnavailable(Exception):
+    """Raised instead of sending a request the provider would not serve."""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider} unavailable: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Take a token, returning how long to wait for it (None if > max_wait)."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max((1 - self.tokens) / self.rate, self.paused_until - now, 0.0)
+            if wait > max_wait:
+                return None
+            # Tokens may go negative: that is the queue of reserved waits
+            self.tokens -= 1
+            return wait
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for a while (provider said Retry-After)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def available(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return round(min(self.burst, self.tokens + elapsed * self.rate), 2)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_started = None
+            if self.state == HALF_OPEN:
+                # One probe at a time; a probe that never reported is given up on
+                if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                    return False
+                self._probe_started = now
+            return True
+
+    def release_probe(self):
+        """The half-open probe admitted by allow() was not sent; let the next call probe."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_started = None
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+
+    def retry_in(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class Provider:
+    def __init__(self, name: str, hosts: List[str], rate: float, burst: int,
+                 max_queue: int = 10, max_wait: float = 5.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.hosts = hosts
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.waiting = 0
+        self.requests = 0
+        self.failures = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def _admit(self) -> Tuple[float, bool]:
+        if not self.breaker.allow():
+            if self.breaker.state == HALF_OPEN:
+                self._reject("circuit half-open, probe in flight")
+            self._reject(f"circuit open, retry in {self.breaker.retry_in():.0f}s")
+        probe = self.breaker.state == HALF_OPEN
+        with self._lock:
+            queue_full = self.waiting >= self.max_queue
+            wait = None if queue_full else self.bucket.reserve(self.max_wait)
+            if wait:
+                self.waiting += 1
+        if queue_full or wait is None:
+            # Nothing will be sent, so nothing will be recorded: don't hold the probe
+            self.breaker.release_probe()
+        if queue_full:
+            self._reject(f"{self.max_queue} requests already waiting")
+        if wait is None:
+            self._reject(f"rate limited for more than {self.max_wait:.0f}s")
+        return wait, probe
+
+    def _reject(self, reason: str):
+        with self._lock:
+            self.rejected += 1
+        raise ProviderUnavailable(self.name, reason)
+
+    def _done_waiting(self):
+        with self._lock:
+            self.waiting -= 1
+
+    def acquire(self) -> bool:
+        """Block until a request may be sent, or raise ProviderUnavailable.
+
+        Returns True if this request is the half-open probe.
+        """
+        wait, probe = self._admit()
+        if wait:
+            try:
+                time.sleep(wait)
+            except BaseException:
+                self.breaker.release_probe()
+                raise
+            finally:
+                self._done_waiting()
+        return probe
+
+    async def acquire_async(self) -> bool:
+        wait, probe = self._admit()
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                # Cancelled while queued: the request is never sent
+                self.breaker.release_probe()
+                raise
+            finally:
+                self._done_waiting()
+        return probe
+
+    def record(self, status_code: Optional[int] = None, headers=None, error: Optional[BaseException] = None):
+        """Feed a request's outcome to the breaker (and Retry-After to the bucket)."""
+        with self._lock:
+            self.requests += 1
+        failed = error is not None or status_code == 429 or (status_code or 0) >= 500
+        if not failed:
+            self.breaker.record_success()
+            return
+
+        with self._lock:
+            self.failures += 1
+        self.breaker.record_failure()
+        if status_code == 429:
+            retry_after = (headers or {}).get("Retry-After")
+            try:
+                self.bucket.pause(float(retry_after))
+            except (TypeError, ValueError):
+                self.bucket.pause(DEFAULT_RETRY_AFTER)
+
+    def state(self) -> Dict:
+        with self._lock:
+            counters = {
+                "requests": self.requests,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "waiting": self.waiting,
+            }
+        return {
+            "hosts": self.hosts,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "retry_in_s": round(self.breaker.retry_in(), 1),
+            "tokens": self.bucket.available(),
+            "rate_per_s": self.bucket.rate,
+            "burst": self.bucket.burst,
+            **counters,
+        }
+
+
+PROVIDERS = [
+    # ~600 calls/min for non-commercial use, shared across the three hosts
+    Provider("open-meteo", [
+        "api.open-meteo.com",
+        "air-quality-api.open-meteo.com",
+        "geocoding-api.open-meteo.com",
+    ], rate=10, burst=20),
+    # Usage policy: absolute maximum of 1 request per second
+    Provider("nominatim", ["nominatim.openstreetmap.org"], rate=1, burst=1, max_queue=5),
+    # 60 requests/min per API key
+    Provider("openaq", ["api.openaq.org"], rate=1, burst=10),
+    # Two query slots per IP, and queries are slow
+    Provider("overpass", ["overpass-api.de"], rate=0.5, burst=2, max_queue=4, max_wait=10.0),
+    # Throttles to about one request every 5 s; burst covers one keyword fan-out
+    Provider("gdelt", ["api.gdeltproject.org"], rate=0.2, burst=3, max_queue=3),
+    Provider("pollen.com", ["www.pollen.com"], rate=2, burst=5),
+    Provider("outbreak.info", ["api.outbreak.info"], rate=2, burst=5),
+    Provider("who", ["www.who.int"], rate=1, burst=2),
+]
+
+_by_host: Dict[str, Provider] = {host: p for p in PROVIDERS for host in p.hosts}
+
+
+def provider_for(url: str) -> Optional[Provider]:
+    return _by_host.get(urlsplit(url).hostname)
+
+
+def registry_state() -> Dict[str, Dict]:
+    """Limiter and breaker state of every provider, for monitoring."""
+    return {p.name: p.state() for p in PROVIDERS}
@@ -0,0 +1,74 @@
+"""
+Single-flight deduplication of concurrent upstream calls.
+
+When several sessions ask for the same thing at the same moment (every
+user picking "New York" at once), only the first caller runs the
+upstream request; the others wait for and share its result:
+
+    flights = SingleFlight("geocode")
+    coords = await flights.do(normalize_city(city), lambda: fetch(city))
+
+Works across threads and event loops: the shared result travels through
+a thread-safe concurrent.futures.Future, and the work itself runs as a
+task on the first caller's loop, so a caller timing out or being
+cancelled does not cancel it for everyone else.
+"""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+groups: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of fn(), shared with every concurrent call for the same key."""
+        with self._lock:
+            self.calls += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if leader:
+            task = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._finish(key, future, t))
+
+        # shield: one waiter giving up must not cancel the shared call
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _finish(self, key: Hashable, future: concurrent.futures.Future, task: asyncio.Task):
+        with self._lock:
+            self._calls.pop(key, None)
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+def flight_stats() -> Dict[str, Dict]:
+    return {name: group.stats() for name, group in groups.items()}
@@ -0,0 +1,154 @@
+"""
+OpenAQ station registry.
+
+Station metadata and sensor lists almost never change, so the
+location -> nearest station lookup (with its sensor_map) is resolved
+locally wherever possible:
+
+  1. a spatial grid index of stations, bulk-loaded from a stored
+     OpenAQ /v3/locations dump (ECOGUARDIAN_OPENAQ_LOCATIONS),
+  2. a long-TTL SQLite cache of previous /v3/locations answers,
+  3. the /v3/locations API itself, whose answer is then cached.
+
+Only the /latest readings call needs the network on a warm registry.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from . import http_client
+from .geo import GridIndex
+from .singleflight import SingleFlight
+from .store import TTLStore
+
+LOCATIONS_URL = "https://api.openaq.org/v3/locations"
+SEARCH_RADIUS_M = 25000   # 25 km, same as the original /locations query
+
+STATION_TTL = 30 * 24 * 3600
+NO_STATION_TTL = 24 * 3600
+
+DEFAULT_DUMP = os.getenv(
+    "ECOGUARDIAN_OPENAQ_LOCATIONS",
+    str(Path(__file__).parent / "data" / "openaq_locations.json"),
+)
+
+_NONE = "__none__"
+
+
+def station_record(location: Dict) -> Dict:
+    """Trim an OpenAQ location object to what get_air_quality needs."""
+    coords = location.get("coordinates") or {}
+    return {
+        "id": location["id"],
+        "name": location.get("name"),
+        "country": (location.get("country") or {}).get("name"),
+        "lat": coords.get("latitude"),
+        "lon": coords.get("longitude"),
+        # JSON object keys are strings, so key sensors by str(id) everywhere
+        "sensor_map": {
+            str(s["id"]): {
+                "name": s["parameter"]["name"],
+                "units": s["parameter"]["units"],
+            }
+            for s in location.get("sensors", [])
+        },
+    }
+
+
+class StationRegistry:
+    def __init__(self, store: Optional[TTLStore] = None, cell_deg: float = 0.25):
+        self.store = store or TTLStore("openaq_stations")
+        self.index = GridIndex(cell_deg)
+        self._lock = threading.Lock()
+        self._flights = SingleFlight("openaq_stations")
+        self.index_hits = 0
+        self.cache_hits = 0
+        self.api_calls = 0
+
+    # -------------------------------------------------
+    # Bulk loading
+    # -------------------------------------------------
+    def bulk_load(self, locations: Iterable[Dict]) -> int:
+        """Index OpenAQ location objects (monitors with coordinates only)."""
+        points = []
+        for loc in locations:
+            if loc.get("isMonitor") is False:
+                continue
+            rec = station_record(loc)
+            if rec["lat"] is None or rec["lon"] is None:
+                continue
+            points.append((rec["lat"], rec["lon"], rec))
+        with self._lock:
+            self.index.bulk_load(points)
+        return len(points)
+
+    def load_dump(self, path: str = DEFAULT_DUMP) -> int:
+        """Load a saved /v3/locations response (or a plain list of locations)."""
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return self.bulk_load(data["results"] if isinstance(data, dict) else data)
+
+    # -------------------------------------------------
+    # Lookup
+    # -------------------------------------------------
+    def _cache_key(self, lat: float, lon: float) -> str:
+        # ~1 km cells: good enough when the search radius is 25 km
+        return f"{lat:.2f},{lon:.2f}"
+
+    def lookup_local(self, lat: float, lon: float):
+        """Return (found, station) without touching the network."""
+        with self._lock:
+            nearest = self.index.nearest(lat, lon, k=1, max_km=SEARCH_RADIUS_M / 1000)
+        if nearest:
+            self.index_hits += 1
+            return True, nearest[0][1]
+
+        found, value = self.store.get(self._cache_key(lat, lon))
+        if found:
+            self.cache_hits += 1
+            return True, None if value == _NONE else value
+        return False, None
+
+    async def find_station(self, lat: float, lon: float, headers: Dict) -> Optional[Dict]:
+        """Nearest monitoring station within 25 km, or None."""
+        found, station = self.lookup_local(lat, lon)
+        if found:
+            return station
+        key = self._cache_key(lat, lon)
+        return await self._flights.do(key, lambda: self._fetch_station(key, lat, lon, headers))
+
+    async def _fetch_station(self, key: str, lat: float, lon: float, headers: Dict) -> Optional[Dict]:
+        self.api_calls += 1
+        params = {
+            "coordinates": f"{lat},{lon}",
+            "radius": SEARCH_RADIUS_M,
+            "limit": 1,
+            "isMonitor": True,
+        }
+        resp = (await http_client.aget(LOCATIONS_URL, params=params, headers=headers)).json()
+
+        if not resp.get("results"):
+            # Only cache a genuine empty answer, not an error payload
+            if "results" in resp:
+                self.store.set(key, _NONE, NO_STATION_TTL)
+            return None
+
+        station = station_record(resp["results"][0])
+        self.store.set(key, station, STATION_TTL)
+        return station
+
+    def stats(self) -> Dict:
+        return {
+            "indexed_stations": len(self.index),
+            "index_hits": self.index_hits,
+            "cache_hits": self.cache_hits,
+            "api_calls": self.api_calls,
+        }
+
+
+registry = StationRegistry()
+registry.load_dump()
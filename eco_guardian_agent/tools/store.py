@@ -0,0 +1,83 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+# Same convention as the session DB in app.py: keep local state under /tmp
+DEFAULT_CACHE_DB = os.getenv("ECOGUARDIAN_CACHE_DB", "/tmp/ecoguardian_cache.db")
+
+stores: List["TTLStore"] = []
+
+
+class TTLStore:
+    """Small SQLite key/value store with a per-entry expiry time.
+
+    Values are stored as JSON. Several stores can share one database file;
+    each uses its own namespace so keys never collide.
+    """
+
+    def __init__(self, namespace: str, path: str = DEFAULT_CACHE_DB):
+        self.namespace = namespace
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        stores.append(self)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS kv (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value). Expired entries count as not found."""
+        found, value, _ = self.get_entry(key)
+        return found, value
+
+    def get_entry(self, key: str) -> Tuple[bool, Any, float]:
+        """Return (found, value, expires_at). Expired entries count as not found."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return False, None, 0.0
+        return True, json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), time.time() + ttl),
+            )
+
+    def delete(self, key: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM kv WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            )
+
+    def clear(self):
+        """Drop every row of this namespace."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM kv WHERE namespace = ?", (self.namespace,))
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop expired rows for this namespace. Returns number of rows removed."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM kv WHERE namespace = ? AND expires_at < ?",
+                (self.namespace, now or time.time()),
+            )
+        return cur.rowcount
@@ -0,0 +1,142 @@
+"""
+Symptom matching engine for check_symptoms.
+
+The disease catalog and synonym table live in data/symptom_catalog.json
+(or ECOGUARDIAN_SYMPTOM_CATALOG) and are compiled once at import:
+
+- plural words the catalog doesn't know are cut back to a known singular
+  ("fevers" -> "fever", "rashes" -> "rash"),
+- one regex that rewrites synonyms to canonical phrases in a single pass
+  ("throwing up" -> "vomiting"),
+- a phrase index: canonical symptom phrase -> diseases,
+- a sub-phrase index: every contiguous word run of a phrase -> diseases.
+
+A user symptom matches a disease symptom when either contains the other
+as a whole-word phrase. Both directions are dict probes over the word
+n-grams of the (short) user symptom, so matching cost does not grow
+with the number of conditions in the catalog.
+"""
+import json
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Set
+
+DEFAULT_CATALOG = os.getenv(
+    "ECOGUARDIAN_SYMPTOM_CATALOG",
+    str(Path(__file__).parent / "data" / "symptom_catalog.json"),
+)
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_SPACES = re.compile(r"\s+")
+
+
+def _clean(text: str) -> str:
+    text = _NON_WORD.sub(" ", text.lower())
+    return _SPACES.sub(" ", text).strip()
+
+
+def _ngrams(words: List[str]):
+    for i in range(len(words)):
+        for j in range(i + 1, len(words) + 1):
+            yield " ".join(words[i:j])
+
+
+class SymptomMatcher:
+    def __init__(self, catalog: Dict):
+        self.diseases: List[str] = list(catalog["diseases"])
+        self.info: Dict[str, Dict] = catalog["diseases"]
+
+        canonical = {_clean(s) for d in self.info.values() for s in d["symptoms"]}
+        rewrites = {_clean(k): _clean(v) for k, v in catalog.get("synonyms", {}).items()}
+        # Canonical phrases map to themselves so that, e.g., "body aches"
+        # is consumed whole before the "aches" synonym can fire inside it
+        rewrites.update({p: p for p in canonical})
+        self._vocab = {w for phrase in list(rewrites) + list(rewrites.values()) for w in phrase.split()}
+        self._rewrites = rewrites
+        alternation = "|".join(re.escape(k) for k in sorted(rewrites, key=len, reverse=True))
+        self._synonym_re = re.compile(rf"\b(?:{alternation})\b") if rewrites else None
+
+        self._phrase_index: Dict[str, Set[int]] = defaultdict(set)
+        self._subphrase_index: Dict[str, Set[int]] = defaultdict(set)
+        for idx, name in enumerate(self.diseases):
+            for symptom in self.info[name]["symptoms"]:
+                phrase = self.normalize(symptom)
+                self._phrase_index[phrase].add(idx)
+                for gram in _ngrams(phrase.split()):
+                    self._subphrase_index[gram].add(idx)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_CATALOG) -> "SymptomMatcher":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _singular(self, word: str) -> str:
+        """Known word as is; otherwise a plural's singular, if the catalog knows it."""
+        if word in self._vocab or not word.endswith("s"):
+            return word
+        stems = [word[:-1], word[:-2]]
+        if word.endswith("ies"):
+            stems.append(word[:-3] + "y")
+        return next((stem for stem in stems if stem in self._vocab), word)
+
+    def normalize(self, text: str) -> str:
+        """Lowercase, strip punctuation, singularize and rewrite synonyms to canonical phrases."""
+        text = " ".join(self._singular(w) for w in _clean(text).split())
+        if self._synonym_re is not None:
+            text = self._synonym_re.sub(lambda m: self._rewrites[m.group(0)], text)
+        return text
+
+    def diseases_for(self, symptom: str) -> Set[int]:
+        """Indexes of diseases with a symptom that contains, or is contained in, this one."""
+        normalized = self.normalize(symptom)
+        if not normalized:
+            return set()
+
+        # user symptom inside a disease symptom ("fever" in "high fever")
+        hits = set(self._subphrase_index.get(normalized, ()))
+        # disease symptom inside the user's text ("fever" in "fever since monday")
+        for gram in _ngrams(normalized.split()):
+            hits |= self._phrase_index.get(gram, set())
+        return hits
+
+    def match(self, symptoms: List[str]) -> List[Dict]:
+        """All diseases matching at least one symptom, best match_score first."""
+        return self._score(symptoms, self.diseases_for)
+
+    def match_many(self, symptom_lists: List[List[str]]) -> List[List[Dict]]:
+        """Batch form of match(); repeated symptoms are only resolved once."""
+        memo: Dict[str, Set[int]] = {}
+
+        def resolve(symptom: str) -> Set[int]:
+            if symptom not in memo:
+                memo[symptom] = self.diseases_for(symptom)
+            return memo[symptom]
+
+        return [self._score(symptoms, resolve) for symptoms in symptom_lists]
+
+    def _score(self, symptoms: List[str], resolve: Callable[[str], Set[int]]) -> List[Dict]:
+        matched: Dict[int, List[str]] = defaultdict(list)
+        for raw in symptoms:
+            for idx in resolve(raw):
+                matched[idx].append(raw.lower().strip())
+
+        matches = []
+        for idx in sorted(matched):
+            info = self.info[self.diseases[idx]]
+            matches.append({
+                "disease": self.diseases[idx],
+                "match_score": round(len(matched[idx]) / len(info["symptoms"]) * 100, 1),
+                "matching_symptoms": matched[idx],
+                "all_symptoms": info["symptoms"],
+                "severity": info["severity"],
+                "recommended_action": info["action"],
+            })
+
+        # Stable sort keeps catalog order among equal scores
+        matches.sort(key=lambda x: x["match_score"], reverse=True)
+        return matches
+
+
+matcher = SymptomMatcher.from_file()
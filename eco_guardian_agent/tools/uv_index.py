@@ -1,35 +1,75 @@
-import requests
-from .helpers import get_coords
+import functools
+from typing import Dict, List
 
+from .cache import cached, location_key
+from .compact import compact_result, summarize_hourly, uv_category
+from .helpers import get_coords_async
+from .loop import run_sync
+from .metrics import timed_tool
+from .openmeteo import forecast_many, get_snapshot
 
-def get_uv_index(city: str):
-    """Retrieve UV index data (current + forecast) using Open-Meteo Air Quality API."""
-    
-    # Step 1: Convert city → coordinates
-    lat, lon = get_coords(city)
-    if lat is None:
-        return {"status": "error", "message": f"City not found: {city}"}
-
-    # Step 2: Request hourly UV index values
-    uv_url = "https://air-quality-api.open-meteo.com/v1/air-quality"
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "hourly": "uv_index,uv_index_clear_sky"
-    }
-
-    resp = requests.get(uv_url, params=params).json()
 
+def uv_from_forecast(city: str, lat: float, lon: float, resp: Dict, include_raw: bool = False) -> Dict:
+    """Build the get_uv_index result from an Open-Meteo forecast payload."""
     if "hourly" not in resp:
         return {"status": "error", "message": "UV data not available", "raw": resp}
 
     hourly = resp["hourly"]
+    times = hourly.get("time", [])
+    now = resp.get("current", {}).get("time")
+    uv = summarize_hourly(times, hourly.get("uv_index", []), now)
+    clear_sky = summarize_hourly(times, hourly.get("uv_index_clear_sky", []), now)
 
-    return {
+    result = {
         "status": "success",
         "city": city,
         "coords": {"lat": lat, "lon": lon},
-        "uv_index": hourly.get("uv_index", []),
-        "uv_index_clear_sky": hourly.get("uv_index_clear_sky", []),
-        "raw": resp
-    }
\ No newline at end of file
+        "uv_current": uv["current"],
+        "uv_category": uv_category(uv["current"]),
+        "uv_today_max": uv["today_max"],
+        "uv_today_max_category": uv_category(uv["today_max"]),
+        "uv_peak_window": uv["peak_window"],
+        "uv_clear_sky_today_max": clear_sky["today_max"],
+    }
+
+    # Full hourly series only on request
+    if include_raw:
+        result["uv_index"] = hourly.get("uv_index", [])
+        result["uv_index_clear_sky"] = hourly.get("uv_index_clear_sky", [])
+        result["raw"] = resp
+    return result
+
+
+@timed_tool("uv")
+@compact_result
+@cached("uv", key=location_key("city"))
+async def get_uv_index_async(city: str, include_raw: bool = False):
+    """Retrieve UV index data (current, today's max, peak window, category) from Open-Meteo.
+
+    Set include_raw=True only if the full hourly series is really needed.
+    """
+    
+    # Step 1: Convert city → coordinates
+    lat, lon = await get_coords_async(city)
+    if lat is None:
+        return {"status": "error", "message": f"City not found: {city}"}
+
+    # Step 2: Hourly UV index values (shared with get_weather)
+    resp = (await get_snapshot(lat, lon))["forecast"]
+    return uv_from_forecast(city, lat, lon, resp, include_raw)
+
+
+async def get_uv_many_async(cities: List[str], include_raw: bool = False) -> Dict[str, Dict]:
+    """UV index for many cities in one Open-Meteo request, keyed by city."""
+    build = functools.partial(uv_from_forecast, include_raw=include_raw)
+    return await forecast_many(cities, build, "City not found: {city}", include_raw)
+
+
+def get_uv_index(city: str, include_raw: bool = False):
+    """Sync wrapper around get_uv_index_async() for scripts."""
+    return run_sync(get_uv_index_async(city, include_raw))
+
+
+def get_uv_many(cities: List[str], include_raw: bool = False) -> Dict[str, Dict]:
+    """Sync wrapper around get_uv_many_async()."""
+    return run_sync(get_uv_many_async(cities, include_raw))
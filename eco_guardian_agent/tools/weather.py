@@ -1,34 +1,15 @@
-import requests
-from .helpers import get_coords
+from typing import Dict, List
 
-def get_weather(city: str):
-    """Fetch current weather (numeric only) using Open-Meteo API."""
-    
-    # 1) Geocode
-    lat, lon = get_coords(city)
-    if lat is None:
-        return {"status": "error", "message": f"Could not geocode {city}"}
+from .cache import cached, location_key
+from .compact import compact_result
+from .helpers import get_coords_async
+from .loop import run_sync
+from .metrics import timed_tool
+from .openmeteo import forecast_many, get_snapshot
 
-    # 2) Fetch weather
-    url = "https://api.open-meteo.com/v1/forecast"
-
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "current": [
-            "temperature_2m",
-            "relative_humidity_2m",
-            "wind_speed_10m",
-            "wind_direction_10m",
-            "precipitation",
-            "weather_code",
-            "cloud_cover"
-        ],
-        "timezone": "auto",
-    }
-
-    resp = requests.get(url, params=params).json()
 
+def weather_from_forecast(city: str, lat: float, lon: float, resp: Dict) -> Dict:
+    """Build the get_weather result from an Open-Meteo forecast payload."""
     if "current" not in resp:
         return {"status": "error", "message": "Weather data unavailable", "raw": resp}
 
@@ -52,4 +33,35 @@ def get_weather(city: str):
 
         # Full raw data
         "raw": c
-    }
\ No newline at end of file
+    }
+
+
+@timed_tool("weather")
+@compact_result
+@cached("weather", key=location_key("city"))
+async def get_weather_async(city: str, include_raw: bool = False):
+    """Fetch current weather (numeric only) using Open-Meteo API."""
+    
+    # 1) Geocode
+    lat, lon = await get_coords_async(city)
+    if lat is None:
+        return {"status": "error", "message": f"Could not geocode {city}"}
+
+    # 2) Fetch weather (shared snapshot with get_uv_index)
+    resp = (await get_snapshot(lat, lon))["forecast"]
+    return weather_from_forecast(city, lat, lon, resp)
+
+
+async def get_weather_many_async(cities: List[str], include_raw: bool = False) -> Dict[str, Dict]:
+    """Current weather for many cities in one Open-Meteo request, keyed by city."""
+    return await forecast_many(cities, weather_from_forecast, "Could not geocode {city}", include_raw)
+
+
+def get_weather(city: str, include_raw: bool = False):
+    """Sync wrapper around get_weather_async() for scripts."""
+    return run_sync(get_weather_async(city, include_raw))
+
+
+def get_weather_many(cities: List[str], include_raw: bool = False) -> Dict[str, Dict]:
+    """Sync wrapper around get_weather_many_async()."""
+    return run_sync(get_weather_many_async(cities, include_raw))
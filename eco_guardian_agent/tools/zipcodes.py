@@ -0,0 +1,76 @@
+"""
+Offline US ZIP-code resolver.
+
+pollen.com needs a ZIP code, and reverse geocoding through Nominatim is a
+rate-limited (1 req/s) extra hop. This resolves coordinates to the
+nearest ZIP centroid from a bundled table instead.
+
+The bundled table (data/us_zip_centroids.csv) is only a seed: central
+ZIPs of the sidebar metros, a few dozen rows. Anywhere else in the US
+still goes to Nominatim (cached per spot). For nationwide offline lookups
+point ECOGUARDIAN_ZIP_TABLE at the Census ZCTA Gazetteer file
+(tab-separated GEOID / INTPTLAT / INTPTLONG columns); plain zip,lat,lon
+CSVs work too.
+"""
+import csv
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+from .geo import GridIndex
+
+DEFAULT_TABLE = os.getenv(
+    "ECOGUARDIAN_ZIP_TABLE",
+    str(Path(__file__).parent / "data" / "us_zip_centroids.csv"),
+)
+
+# Beyond this the nearest centroid is probably not "our" ZIP; ask Nominatim
+MAX_DISTANCE_KM = 8.0
+
+
+class ZipResolver:
+    def __init__(self, max_km: float = MAX_DISTANCE_KM, cell_deg: float = 0.1):
+        self.max_km = max_km
+        self.index = GridIndex(cell_deg)
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: str = DEFAULT_TABLE) -> int:
+        """Load a ZIP centroid table; returns the number of rows indexed."""
+        if not os.path.exists(path):
+            return 0
+
+        with open(path, newline="", encoding="utf-8") as f:
+            first = f.readline()
+            f.seek(0)
+            delimiter = "\t" if "\t" in first else ","
+            reader = csv.DictReader(f, delimiter=delimiter)
+            # Gazetteer headers may carry trailing whitespace
+            reader.fieldnames = [h.strip().lower() for h in reader.fieldnames or []]
+
+            points = []
+            for row in reader:
+                zipcode = row.get("zip") or row.get("geoid")
+                lat = row.get("lat") or row.get("intptlat")
+                lon = row.get("lon") or row.get("intptlong")
+                if zipcode and lat and lon:
+                    points.append((float(lat), float(lon), zipcode.strip().zfill(5)))
+
+        self.index.bulk_load(points)
+        return len(points)
+
+    def nearest(self, lat: float, lon: float) -> Optional[str]:
+        """Nearest ZIP within max_km, or None (caller falls back to Nominatim)."""
+        found = self.index.nearest(lat, lon, k=1, max_km=self.max_km)
+        if found:
+            self.hits += 1
+            return found[0][1]
+        self.misses += 1
+        return None
+
+    def stats(self) -> Dict:
+        return {"zips": len(self.index), "hits": self.hits, "misses": self.misses}
+
+
+zip_resolver = ZipResolver()
+zip_resolver.load()
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The app's scripts import their siblings as top-level modules (agent, dashboard, tools)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "eco_guardian_agent"))
+
+# Keep the SQLite stores out of /tmp/ecoguardian_cache.db
+os.environ.setdefault("ECOGUARDIAN_CACHE_DB", os.path.join(tempfile.mkdtemp(), "test_cache.db"))
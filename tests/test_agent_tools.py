@@ -0,0 +1,28 @@
+import inspect
+
+import agent
+from tools import agent_tools
+
+
+def _tool_names(llm_agent):
+    return {getattr(tool, "__name__", None) for tool in llm_agent.tools}
+
+
+def test_agents_expose_the_original_tool_names():
+    assert _tool_names(agent.weather_agent) == {"get_weather"}
+    assert _tool_names(agent.hospital_locator) == {"find_nearest_hospitals"}
+    assert "get_disease_outbreaks" in _tool_names(agent.outbreak_monitor)
+
+
+def test_wrappers_are_async_and_hide_include_raw():
+    for name in ("get_air_quality", "get_weather", "get_pollen", "get_uv_index"):
+        func = getattr(agent_tools, name)
+        assert inspect.iscoroutinefunction(func)
+        assert list(inspect.signature(func).parameters) == ["city"]
+
+
+def test_uv_tool_names_its_actual_source():
+    from tools.agent_tools import get_uv_index
+
+    assert "forecast" in get_uv_index.__doc__
+    assert "Air Quality" not in get_uv_index.__doc__
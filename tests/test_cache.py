@@ -0,0 +1,58 @@
+import asyncio
+
+from tools import helpers
+from tools.cache import TOOL_TTLS, cached, location_key, max_age
+from tools.providers import ProviderUnavailable
+
+# Own cache names, so the real tools' caches stay registered
+TOOL_TTLS["test_lookup"] = TOOL_TTLS["test_counter"] = (60, 600)
+calls = []
+
+
+@cached("test_lookup", key=location_key("city"))
+async def _lookup(city: str):
+    lat, lon = await helpers.get_coords_async(city)
+    return {"status": "success", "lat": lat, "lon": lon}
+
+
+@cached("test_counter")
+async def _counter(name: str):
+    calls.append(name)
+    return {"status": "success", "call": len(calls)}
+
+
+def test_geocoder_outage_returns_error_instead_of_raising(monkeypatch):
+    async def unavailable(city):
+        raise ProviderUnavailable("open-meteo", "circuit open")
+
+    monkeypatch.setattr(helpers, "get_coords_async", unavailable)
+
+    result = asyncio.run(_lookup("Atlantis Outage"))
+
+    assert result["status"] == "error"
+    assert "circuit open" in result["message"]
+
+
+def _age(func, seconds):
+    cache = func.cache
+    for key, (at, value) in list(cache._data.items()):
+        cache._data[key] = (at - seconds, value)
+
+
+def test_max_age_recomputes_stale_results_inline():
+    first = asyncio.run(_counter("max-age"))
+    _age(_counter, 120)  # past the soft TTL: normally served while refreshing
+
+    with max_age(300):
+        second = asyncio.run(_counter("max-age"))
+
+    assert second["call"] == first["call"] + 1
+
+
+def test_max_age_recomputes_fresh_results_older_than_the_limit():
+    first = asyncio.run(_counter("fresh"))
+    _age(_counter, 30)
+
+    assert asyncio.run(_counter("fresh"))["call"] == first["call"]
+    with max_age(10):
+        assert asyncio.run(_counter("fresh"))["call"] == first["call"] + 1
@@ -0,0 +1,93 @@
+import asyncio
+
+import dashboard
+
+
+def test_failed_part_is_not_refetched_until_retry_after(monkeypatch):
+    calls = []
+
+    async def failing(city):
+        calls.append(city)
+        return {"status": "error", "message": "HTTP 429"}
+
+    async def working(city):
+        return {"status": "success"}
+
+    async def events(agent, text, user_id=dashboard.DASHBOARD_USER):
+        return "events"
+
+    cards = {key: working for key in dashboard.CARD_TOOLS}
+    cards["pollen"] = failing
+    monkeypatch.setattr(dashboard, "CARD_TOOLS", cards)
+    monkeypatch.setattr(dashboard, "run_agent_once", events)
+
+    city = "Testville Failing"
+    asyncio.run(dashboard.load_dashboard_async(city, summary=False))
+    second = asyncio.run(dashboard.load_dashboard_async(city, summary=False))
+
+    assert len(calls) == 1
+    assert second["pollen"].startswith("Pollen data is unavailable")
+    assert dashboard.stale_parts(city, summary=False) == []
+
+    dashboard.invalidate_parts(city)
+    assert "pollen" in dashboard.stale_parts(city, summary=False)
+
+
+def test_cards_ask_their_tools_for_non_stale_results(monkeypatch):
+    from tools.cache import current_max_age
+
+    seen = []
+
+    async def tool(city):
+        seen.append(current_max_age())
+        return {"status": "success"}
+
+    monkeypatch.setattr(dashboard, "CARD_TOOLS", {**dashboard.CARD_TOOLS, "weather": tool})
+
+    asyncio.run(dashboard.fetch_card("weather", "Testville Fresh"))
+
+    assert seen == [dashboard.CARD_MAX_AGE]
+    assert current_max_age() is None
+
+
+def test_refresh_refetches_from_upstream(monkeypatch):
+    from tools import openmeteo
+    from tools.geocache import geocache
+    from tools.weather import get_weather_async
+
+    forecasts = []
+
+    class Response:
+        status_code = 200
+
+        def __init__(self, payload):
+            self._payload = payload
+
+        def json(self):
+            return self._payload
+
+    async def aget(url, params=None, **kwargs):
+        if url != openmeteo.FORECAST_URL:
+            return Response({})
+        forecasts.append(url)
+        current = {"temperature_2m": float(len(forecasts)), "weather_code": 0}
+        return Response({"current": current, "hourly": {"time": [], "uv_index": []}})
+
+    async def events(agent, text, user_id=dashboard.DASHBOARD_USER):
+        return "events"
+
+    city = "Testville Refresh"
+    geocache.put(city, (41.5, -72.5))
+    monkeypatch.setattr(openmeteo.http_client, "aget", aget)
+    monkeypatch.setattr(dashboard, "CARD_TOOLS", {"weather": get_weather_async})
+    monkeypatch.setattr(dashboard, "run_agent_once", events)
+
+    first = asyncio.run(dashboard.load_dashboard_async(city, summary=False))
+    asyncio.run(dashboard.load_dashboard_async(city, summary=False))
+    assert len(forecasts) == 1
+
+    dashboard.invalidate_parts(city)
+    asyncio.run(dashboard.refresh_city(city, summary=False))
+
+    assert len(forecasts) == 2
+    assert dashboard.read_parts(city, summary=False)["weather"] != first["weather"]
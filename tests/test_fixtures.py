@@ -0,0 +1,17 @@
+from tools import fixtures
+
+GDELT = "https://api.gdeltproject.org/api/v2/doc/doc?query=flu&mode=ArtList&startdatetime={}000000&enddatetime={}235959"
+
+
+def test_gdelt_fixture_key_ignores_the_date_window():
+    today = fixtures.fixture_path("GET", GDELT.format("20260917", "20261017"), None)
+    tomorrow = fixtures.fixture_path("GET", GDELT.format("20260918", "20261018"), None)
+
+    assert today == tomorrow
+
+
+def test_other_params_still_distinguish_fixtures():
+    boston = fixtures.fixture_path("GET", "https://api.open-meteo.com/v1/forecast?latitude=42.36&longitude=-71.06", None)
+    miami = fixtures.fixture_path("GET", "https://api.open-meteo.com/v1/forecast?latitude=25.77&longitude=-80.19", None)
+
+    assert boston != miami
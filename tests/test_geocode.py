@@ -0,0 +1,61 @@
+import time
+
+from tools import helpers
+from tools.geocache import GeoCache, geocache
+from tools.store import TTLStore
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        if isinstance(self._payload, Exception):
+            raise self._payload
+        return self._payload
+
+
+def test_error_payloads_are_not_negative_cached():
+    for response in (
+        FakeResponse(429, {"error": True, "reason": "Too many requests"}),
+        FakeResponse(503, ValueError("<html>")),
+        FakeResponse(200, {"error": True, "reason": "bad"}),
+    ):
+        assert helpers._remember_geocode("Nowhereville Errors", response) == (None, None)
+        assert geocache.lookup("Nowhereville Errors") == (False, None)
+
+
+def test_empty_answer_is_negative_cached():
+    helpers._remember_geocode("Nowhereville Empty", FakeResponse(200, {"generationtime_ms": 0.4}))
+
+    assert geocache.lookup("Nowhereville Empty") == (True, None)
+
+
+def test_memory_entries_expire_with_the_store(tmp_path):
+    cache = GeoCache(store=TTLStore("geocode", str(tmp_path / "geo.db")))
+    cache.put("Springfield", (1.0, 2.0))
+    key = "springfield"
+    coords, _ = cache._lru[key]
+    cache._lru[key] = (coords, time.time() - 1)
+    cache.store.delete(key)
+
+    assert cache.lookup("Springfield") == (False, None)
+
+
+def test_reverse_zip_errors_are_not_cached():
+    lat, lon = 12.345, 67.891
+
+    assert helpers._remember_zip(lat, lon, FakeResponse(429, ValueError("<html>"))) is None
+    assert helpers._zip_cache.get(helpers._zip_cache_key(lat, lon)) == (False, None)
+
+    assert helpers._remember_zip(lat, lon, FakeResponse(200, {"address": {"postcode": "99999"}})) == "99999"
+    assert helpers._zip_cache.get(helpers._zip_cache_key(lat, lon)) == (True, "99999")
+
+
+def test_geocoder_errors_go_to_the_logger(caplog, capsys):
+    with caplog.at_level("WARNING", logger="ecoguardian"):
+        helpers._remember_geocode("Nowhereville Logged", FakeResponse(503, ValueError("<html>")))
+
+    assert "geocoding Nowhereville Logged failed: HTTP 503" in caplog.text
+    assert capsys.readouterr().out == ""
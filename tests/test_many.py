@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from tools import openmeteo, uv_index, weather
+
+
+@pytest.mark.parametrize("module, func", [(weather, "get_weather_many_async"), (uv_index, "get_uv_many_async")])
+def test_no_city_located_still_returns_finalized_results(monkeypatch, module, func):
+    async def not_found(city):
+        return None, None
+
+    monkeypatch.setattr(openmeteo, "get_coords_async", not_found)
+
+    results = asyncio.run(getattr(module, func)(["Atlantis", "El Dorado"]))
+
+    assert set(results) == {"Atlantis", "El Dorado"}
+    for result in results.values():
+        assert result["status"] == "error"
+        assert "result_tokens_est" in result
+
+
+@pytest.mark.parametrize("module, func", [(weather, "get_weather_many_async"), (uv_index, "get_uv_many_async")])
+def test_results_follow_input_order(monkeypatch, module, func):
+    coords = {"Boston": (42.36, -71.06), "Denver": (39.74, -104.99)}
+
+    async def lookup(city):
+        return coords.get(city, (None, None))
+
+    async def snapshots(located):
+        forecast = {"current": {"time": "2026-10-17T12:00", "temperature_2m": 10.0},
+                    "hourly": {"time": ["2026-10-17T12:00"], "uv_index": [3.0], "uv_index_clear_sky": [3.5]}}
+        return [{"forecast": forecast} for _ in located]
+
+    monkeypatch.setattr(openmeteo, "get_coords_async", lookup)
+    monkeypatch.setattr(openmeteo, "get_snapshots_many", snapshots)
+
+    results = asyncio.run(getattr(module, func)(["Denver", "Atlantis", "Boston"]))
+
+    assert list(results) == ["Denver", "Atlantis", "Boston"]
+    assert [r["status"] for r in results.values()] == ["success", "error", "success"]
@@ -0,0 +1,41 @@
+from tools import metrics
+
+
+def test_exposition_declares_every_family():
+    metrics.registry.reset()
+    metrics.observe_http("open-meteo", "GET", 0.12, status=200, size=2048)
+    metrics.observe_http("open-meteo", "GET", 0.5, error=TimeoutError())
+
+    text = metrics.render_prometheus()
+    types = dict(line.split()[2:4] for line in text.splitlines() if line.startswith("# TYPE"))
+
+    assert types["ecoguardian_http_request_seconds"] == "histogram"
+    assert types["ecoguardian_http_responses_total"] == "counter"
+    assert types["ecoguardian_provider_circuit_state"] == "gauge"
+    samples = {line.split("{")[0].split(" ")[0] for line in text.splitlines() if not line.startswith("#")}
+    for sample in samples:
+        family = sample.removesuffix("_bucket").removesuffix("_sum").removesuffix("_count")
+        assert family in types or sample in types
+
+
+def test_circuit_state_is_one_hot():
+    lines = [
+        line for line in metrics.render_prometheus().splitlines()
+        if line.startswith('ecoguardian_provider_circuit_state{provider="open-meteo"')
+    ]
+
+    assert len(lines) == 3
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == 1
+
+
+def test_geocoder_and_pool_state_are_exported():
+    from tools.geocache import geocache
+
+    geocache.put("Metricsville", (1.0, 2.0))
+    geocache.lookup("Metricsville")
+
+    text = metrics.render_prometheus()
+
+    assert "# TYPE ecoguardian_geocode_hit_ratio gauge" in text
+    assert "ecoguardian_geocode_hits " in text
+    assert "ecoguardian_http_async_connections " in text
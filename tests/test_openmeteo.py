@@ -0,0 +1,62 @@
+import asyncio
+
+from tools import openmeteo
+from tools.cache import max_age
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload=None):
+        self._payload = payload
+
+    def json(self):
+        if self._payload is None:
+            raise ValueError("Expecting value")
+        return self._payload
+
+
+FORECAST = {"current": {"temperature_2m": 20.0}, "hourly": {"uv_index": [1.0]}}
+
+
+def test_non_json_air_quality_keeps_the_weather(monkeypatch):
+    async def aget(url, params=None, **kwargs):
+        return FakeResponse(FORECAST if url == openmeteo.FORECAST_URL else None)
+
+    monkeypatch.setattr(openmeteo.http_client, "aget", aget)
+    openmeteo.clear()
+
+    snap = asyncio.run(openmeteo.get_snapshot(10.0, 20.0))
+    many = asyncio.run(openmeteo.get_snapshots_many([(11.0, 21.0), (12.0, 22.0)]))
+
+    assert snap["forecast"] == FORECAST
+    assert snap["air_quality"]["error"] is True
+    assert all(s["forecast"] == FORECAST and s["air_quality"]["error"] for s in many)
+
+
+def test_snapshots_are_bounded(monkeypatch):
+    monkeypatch.setattr(openmeteo, "MAX_SNAPSHOTS", 3)
+    openmeteo.clear()
+    for i in range(5):
+        openmeteo._store((float(i), 0.0), FORECAST, {})
+
+    assert list(openmeteo._snapshots) == [(2.0, 0.0), (3.0, 0.0), (4.0, 0.0)]
+
+
+def test_max_age_refetches_the_snapshot(monkeypatch):
+    fetched = []
+
+    async def aget(url, params=None, **kwargs):
+        fetched.append(url)
+        return FakeResponse(FORECAST if url == openmeteo.FORECAST_URL else {})
+
+    monkeypatch.setattr(openmeteo.http_client, "aget", aget)
+    openmeteo.clear()
+
+    asyncio.run(openmeteo.get_snapshot(30.0, 40.0))
+    asyncio.run(openmeteo.get_snapshot(30.0, 40.0))
+    assert fetched.count(openmeteo.FORECAST_URL) == 1
+
+    with max_age(0):
+        asyncio.run(openmeteo.get_snapshot(30.0, 40.0))
+    assert fetched.count(openmeteo.FORECAST_URL) == 2
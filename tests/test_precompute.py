@@ -0,0 +1,9 @@
+import importlib
+
+
+def test_precompute_imports_as_script_module():
+    # What `python precompute.py` and app.py's ECOGUARDIAN_PRECOMPUTE path do
+    precompute = importlib.import_module("precompute")
+
+    assert callable(precompute.main)
+    assert callable(precompute.run_forever)
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from tools import http_client
+from tools.providers import CLOSED, HALF_OPEN, OPEN, Provider, ProviderUnavailable, provider_for
+
+
+def _half_open(provider: Provider):
+    provider.breaker.state = OPEN
+    provider.breaker.opened_at = time.monotonic() - provider.breaker.reset_timeout
+
+
+def test_rate_limited_probe_does_not_wedge_the_breaker():
+    provider = Provider("test", ["example.invalid"], rate=0.001, burst=1, max_wait=0.0)
+    provider.bucket.tokens = 0
+    _half_open(provider)
+
+    with pytest.raises(ProviderUnavailable, match="rate limited"):
+        provider.acquire()
+    assert provider.breaker.state == HALF_OPEN
+
+    # The next admitted call becomes the probe and its success closes the circuit
+    provider.bucket.tokens = 1
+    provider.acquire()
+    provider.record(status_code=200)
+    assert provider.breaker.state == CLOSED
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_non_transport_error_releases_the_probe(monkeypatch, use_async):
+    url = "https://www.who.int/feeds/entity/csr/don/en/rss.xml"
+    provider = provider_for(url)
+    monkeypatch.setattr(provider, "breaker", type(provider.breaker)(reset_timeout=30.0))
+    _half_open(provider)
+
+    def boom(*args, **kwargs):
+        raise ValueError("not a transport error")
+
+    async def aboom(*args, **kwargs):
+        boom()
+
+    monkeypatch.setattr(http_client.session, "request", boom)
+    monkeypatch.setattr(http_client, "get_async_client", lambda: type("Client", (), {"request": staticmethod(aboom)})())
+
+    with pytest.raises(ValueError):
+        if use_async:
+            asyncio.run(http_client.aget(url))
+        else:
+            http_client.get(url)
+
+    assert provider.breaker.state == HALF_OPEN
+    assert provider.breaker.allow()
@@ -0,0 +1,51 @@
+import pytest
+
+from tools.symptoms import matcher
+
+
+def names(symptoms):
+    return {m["disease"] for m in matcher.match(symptoms)}
+
+
+@pytest.mark.parametrize("plural, singular", [
+    ("fevers", "fever"),
+    ("coughs", "cough"),
+    ("rashes", "rash"),
+    ("Sore throats", "sore throat"),
+    ("runny noses", "runny nose"),
+])
+def test_plurals_match_like_the_singular(plural, singular):
+    assert names([plural])
+    assert names([plural]) == names([singular])
+
+
+def test_plural_catalog_phrases_are_left_alone():
+    assert "Malaria" in names(["chills"])
+    assert "Measles" in names(["red eyes"])
+    assert "Influenza" in names(["body aches"])
+
+
+@pytest.mark.parametrize("synonym, canonical", [
+    ("throwing up", "vomiting"),
+    ("coughing", "cough"),
+    ("high temperature", "high fever"),
+    ("difficulty breathing", "shortness of breath"),
+    ("headaches", "headache"),
+])
+def test_synonyms_match_their_canonical_symptom(synonym, canonical):
+    assert names([synonym]) == names([canonical])
+
+
+def test_multi_word_phrases_match_both_ways():
+    # disease symptom inside the user's text
+    assert "COVID-19" in names(["sudden loss of smell since monday"])
+    # user symptom inside a disease symptom
+    assert "Cholera" in names(["diarrhea"])
+    # whole words only: "ache" is not part of "headache"
+    assert "Influenza" not in names(["earache"])
+
+
+def test_match_many_agrees_with_match():
+    lists = [["fevers", "coughs"], ["rashes"], ["throwing up", "fevers"]]
+
+    assert matcher.match_many(lists) == [matcher.match(s) for s in lists]